@@ -1,9 +1,4 @@
 ''' Git Server Interface '''
-from models.httpResponse import HttpResponse
-from models.gitlabHandler import GitlabHandler
-from models.bitbucketCloud import BitbucketCloud
-from models.bitbucketServer import BitbucketServer
-from models.azureDevOpsHandler import AzureDevOpsHandler
 from models.exceptions import DuplicateRemote
 from modules.utils import ( INFO_TAG, WARNING_TAG, print_key_value_list, call_subprocess )
 
@@ -16,14 +11,20 @@ class GitServer():
 
 
 	def __get_handler(self, host, **kwargs):
+		# only the handler of the host is imported
+		# pylint: disable=C0415
 		if 'bitbucket' in host and not kwargs[ 'isBitbucketServer' ]:
+			from models.bitbucketCloud import BitbucketCloud
 			self.gitHandler = BitbucketCloud( host, kwargs[ 'owner' ], kwargs[ 'projectName' ] )
 		elif 'gitlab' in host:
+			from models.gitlabHandler import GitlabHandler
 			self.gitHandler = GitlabHandler( host, kwargs[ 'projectId' ] )
 		elif 'dev.azure.com' in host:
+			from models.azureDevOpsHandler import AzureDevOpsHandler
 			self.gitHandler = AzureDevOpsHandler( host, kwargs[ 'owner' ], kwargs[ 'projectName' ], kwargs[ 'repositoryId' ] )
 		else:
 			if kwargs[ 'isBitbucketServer' ]:
+				from models.bitbucketServer import BitbucketServer
 				self.gitHandler = BitbucketServer( host, kwargs[ 'owner' ], kwargs[ 'projectName' ] )
 			else:
 				raise Exception( 'Not implemented' )
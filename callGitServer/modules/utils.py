@@ -1,11 +1,8 @@
 ''' Utils module '''
 import subprocess
 
-from colorama import init as colorama_init
 from colorama import Fore, Style
 
-colorama_init(autoreset=True)
-
 FILE_TAG            = f'{Fore.YELLOW}[FILE]{Fore.RESET}'
 DATA_TAG            = f'{Fore.MAGENTA}[DATA]{Fore.RESET}'
 INFO_TAG            = f'{Fore.YELLOW}[INFO]{Fore.RESET}'
@@ -1,10 +1,10 @@
 import os
 import re
-import json
 import shutil
 from modules.merger.mergeFiles import mergeFile
 from modules.utils import argparser, SET_PARSEABLE_FOLDERS
 from modules.utils.utilities import checkFolder
+from modules.utils.describeCache import loadDescribe
 from modules.utils.exceptions import NotCreatedDescribeLog
 
 def main():
@@ -28,14 +28,9 @@ def readDescribe(pathDescribe, setParseableObjects):
     if not os.path.isfile( pathDescribe ):
         raise NotCreatedDescribeLog( pathDescribe )
     
-    with open( pathDescribe, 'r' ) as file:
-        data = json.load( file )
-
-    for metadataInfo in data[ 'metadataObjects' ]:
-        dirName         = metadataInfo[ 'directoryName' ]
-        childObjects    = metadataInfo[ 'childXmlNames' ] if 'childXmlNames' in metadataInfo else []
-        if len( childObjects ) > 0:
-            setParseableObjects.add( dirName )
+    for metadataInfo in loadDescribe( pathDescribe ):
+        if len( metadataInfo[ 'childXmlNames' ] ) > 0:
+            setParseableObjects.add( metadataInfo[ 'directoryName' ] )
 
     return setParseableObjects
 
@@ -0,0 +1,57 @@
+import os
+import re
+import json
+import pickle
+import hashlib
+
+# Same layout and location as the merger describe cache, both tools share it
+CACHE_VERSION	= 1
+CACHE_FOLDER	= os.path.join( os.environ.get( 'XDG_CACHE_HOME', os.path.expanduser( '~/.cache' ) ), 'alm-sf-describe' )
+
+LOG_REGEX		= re.compile( r'\*+\nXMLName: ([a-zA-Z0-9]+)\nDirName: ([a-zA-Z0-9]+)\nSuffix: ([a-zA-Z0-9]+)\nHasMetaFile: ([a-zA-Z]+)'
+							  r'\nInFolder: ([a-zA-Z]+)\nChildObjects: (?:([a-zA-Z,]+),|)\*+', re.MULTILINE )
+
+
+def loadDescribe(pathDescribe):
+	''' Returns the metadata records of a describe from the compiled cache, compiling it when missing '''
+	with open( pathDescribe, 'rb' ) as file:
+		content = file.read()
+
+	digest		= hashlib.sha256( content ).hexdigest()
+	pathCache	= os.path.join( CACHE_FOLDER, f'v{CACHE_VERSION}-{digest}.pickle' )
+	try:
+		with open( pathCache, 'rb' ) as file:
+			return pickle.load( file )
+	except ( OSError, pickle.UnpicklingError, EOFError ):
+		pass
+
+	records = parseDescribe( content.decode( 'utf-8' ) )
+	writeCache( pathCache, records )
+	return records
+
+
+def parseDescribe(data):
+	try:
+		metadataObjects = json.loads( data )[ 'metadataObjects' ]
+	except ValueError:
+		return [ { 'xmlName': xmlName, 'directoryName': dirName, 'suffix': suffix,
+				   'metaFile': 'true' == hasMetadata, 'inFolder': 'true' == inFolder,
+				   'childXmlNames': childObjects.split( ',' ) if childObjects else [] }
+				 for ( xmlName, dirName, suffix, hasMetadata, inFolder, childObjects ) in LOG_REGEX.findall( data ) ]
+
+	return [ { 'xmlName': metadataInfo[ 'xmlName' ], 'directoryName': metadataInfo[ 'directoryName' ],
+			   'suffix': metadataInfo.get( 'suffix', '' ), 'metaFile': metadataInfo[ 'metaFile' ],
+			   'inFolder': metadataInfo[ 'inFolder' ], 'childXmlNames': list( metadataInfo.get( 'childXmlNames', [] ) ) }
+			 for metadataInfo in metadataObjects ]
+
+
+def writeCache(pathCache, records):
+	pathTemp = f'{pathCache}.{os.getpid()}.tmp'
+	try:
+		os.makedirs( CACHE_FOLDER, exist_ok=True )
+		with open( pathTemp, 'wb' ) as file:
+			pickle.dump( records, file, protocol=pickle.HIGHEST_PROTOCOL )
+		os.replace( pathTemp, pathCache )
+	except OSError:
+		if os.path.isfile( pathTemp ):
+			os.remove( pathTemp )
@@ -0,0 +1,192 @@
+#!/usr/local/bin/python3
+''' End to end benchmark of the merger deltas over a synthetic repository,
+    each phase is timed from the banners printed by the merger '''
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic_repo import (BASE_BRANCH, SyntheticRepository,
+                            add_shape_arguments, get_shape)
+
+TIMINGS_FILE = 'merger-timings.json'
+MERGER = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.realpath(__file__))), 'merger.py')
+ANSI_ESCAPE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
+PHASE_LINE = re.compile(r'^\[INFO\] (.+)$')
+# quoted values and numbers change between runs, not the phase
+PHASE_VALUES = re.compile(r'\'[^\']*\'|\d+')
+
+
+def run_merger(repository, arguments):
+    ''' Runs the merger in the repository, returns the exit code, the total
+        seconds and the seconds of each phase, with the timings written by
+        the merger if any '''
+    timings_path = os.path.join(repository, 'artifacts_folder', TIMINGS_FILE)
+    if os.path.isfile(timings_path):
+        os.remove(timings_path)
+    command = [sys.executable, MERGER, *arguments]
+    environment = dict(os.environ, PYTHONUNBUFFERED='1')
+    banners = []
+    output = []
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=repository, env=environment,
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT)
+    for line in process.stdout:
+        line = ANSI_ESCAPE.sub('', line.decode('utf-8', 'replace')).strip()
+        output.append(line)
+        match = PHASE_LINE.match(line)
+        if match:
+            banners.append((PHASE_VALUES.sub('*', match.group(1)),
+                            time.perf_counter()))
+    exit_code = process.wait()
+    end = time.perf_counter()
+
+    phases = [{'phase': phase,
+               'seconds': round((banners[index + 1][1] if index + 1 <
+                                 len(banners) else end) - phase_start, 6)}
+              for index, (phase, phase_start) in enumerate(banners)]
+    if exit_code != 0:
+        print(f'\t! Exit code {exit_code}, last output lines:')
+        for line in output[-5:]:
+            print(f'\t  {line}')
+    result = {'exit_code': exit_code, 'seconds': round(end - start, 6),
+              'phases': phases}
+    if os.path.isfile(timings_path):
+        with open(timings_path) as timings_file:
+            result['timings'] = json.load(timings_file)
+    return result
+
+
+def benchmark_build_delta(repository, base, branch, repeat, arguments):
+    ''' Times build_delta from the base commit to the branch '''
+    return [run_merger(repository, ['build_delta', '-nf', '-s', branch,
+                                    '-t', base, *arguments])
+            for _ in range(repeat)]
+
+
+def benchmark_merge_delta(repository, branch, repeat, arguments):
+    ''' Times merge_delta of the branch into the base branch, which is
+        reset before every run '''
+    target_head = git(repository, 'rev-parse', BASE_BRANCH).strip()
+    runs = []
+    for _ in range(repeat):
+        git(repository, 'checkout', '-q', '-f', BASE_BRANCH)
+        git(repository, 'reset', '-q', '--hard', target_head)
+        runs.append(run_merger(repository, ['merge_delta', '-nf', '-nr',
+                                            '-s', branch, '-t', BASE_BRANCH,
+                                            *arguments]))
+    git(repository, 'checkout', '-q', '-f', BASE_BRANCH)
+    git(repository, 'reset', '-q', '--hard', target_head)
+    return runs
+
+
+def git(repository, *args):
+    ''' Runs a git command in the repository, returns its output '''
+    return subprocess.run(['git', *args], cwd=repository, check=True,
+                          stdout=subprocess.PIPE).stdout.decode('utf-8')
+
+
+def get_versions():
+    ''' Returns the versions of the merger, python and git '''
+    merger = subprocess.run([sys.executable, MERGER, 'version'],
+                            stdout=subprocess.PIPE, check=False)
+    return {'merger': merger.stdout.decode('utf-8').strip(),
+            'python': platform.python_version(),
+            'git': git('.', '--version').strip()}
+
+
+def get_result(command, ratio, runs):
+    ''' Returns the result of the runs of a command for a change ratio '''
+    seconds = [run['seconds'] for run in runs if run['exit_code'] == 0]
+    return {'command': command, 'change_ratio': ratio,
+            'median_seconds': statistics.median(seconds) if seconds else None,
+            'runs': runs}
+
+
+def parse_args():
+    ''' Parse args '''
+    parser = argparse.ArgumentParser(description='Generates a synthetic '
+                                     'Salesforce repository and times '
+                                     'build_delta and merge_delta on it')
+    add_shape_arguments(parser)
+    parser.add_argument('-c', '--commands', nargs='+',
+                        default=['build_delta', 'merge_delta'],
+                        choices=['build_delta', 'merge_delta'],
+                        help='Merger commands to time, default=both')
+    parser.add_argument('-n', '--repeat', default=3, type=int,
+                        help='Runs of each command and ratio, default=3')
+    parser.add_argument('-ma', '--merger-args', default='',
+                        help='Extra arguments for the merger commands, '
+                             'e.g. "-j 4 -io 16"')
+    parser.add_argument('-r', '--repository',
+                        help='Folder to generate the repository in, a '
+                             'temporary folder is used by default')
+    parser.add_argument('-k', '--keep', action='store_true',
+                        help='Keeps the generated repository')
+    parser.add_argument('-out', '--output', default='benchmark.json',
+                        help='JSON file for the results, '
+                             'default=\'benchmark.json\'')
+    return parser.parse_args()
+
+
+def main():
+    ''' Main method '''
+    args = parse_args()
+    shape = get_shape(args)
+    merger_args = args.merger_args.split()
+    temp_folder = None
+    repository = args.repository
+    if not repository:
+        temp_folder = tempfile.mkdtemp(prefix='merger-benchmark-')
+        repository = os.path.join(temp_folder, 'repository')
+
+    try:
+        print(f'Generating repository in \'{repository}\'')
+        start = time.perf_counter()
+        base, branches = SyntheticRepository(repository, shape,
+                                             args.seed).generate(
+                                                 args.change_ratios)
+        generation_seconds = round(time.perf_counter() - start, 6)
+
+        results = []
+        for ratio, branch in branches.items():
+            if 'build_delta' in args.commands:
+                print(f'Timing build_delta for \'{branch}\'')
+                runs = benchmark_build_delta(repository, base, branch,
+                                             args.repeat, merger_args)
+                results.append(get_result('build_delta', ratio, runs))
+            if 'merge_delta' in args.commands:
+                print(f'Timing merge_delta for \'{branch}\'')
+                runs = benchmark_merge_delta(repository, branch, args.repeat,
+                                             merger_args)
+                results.append(get_result('merge_delta', ratio, runs))
+    finally:
+        if temp_folder and not args.keep:
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
+    report = {'versions': get_versions(),
+              'shape': shape.to_dict(),
+              'seed': args.seed,
+              'merger_args': merger_args,
+              'generation_seconds': generation_seconds,
+              'results': results}
+    with open(args.output, 'w') as output_file:
+        json.dump(report, output_file, indent=4)
+
+    for result in results:
+        print(f'\t- {result["command"]} {result["change_ratio"]:.0%}: '
+              f'{result["median_seconds"]} s')
+    print(f'Results written in \'{args.output}\'')
+
+
+if __name__ == '__main__':
+    main()
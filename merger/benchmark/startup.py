@@ -0,0 +1,119 @@
+#!/usr/local/bin/python3
+''' Startup benchmark of the command line tools, sums the import time that
+    python -X importtime reports for a command and checks it against the
+    budget of the command '''
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import namedtuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.realpath(__file__))))
+# nothing listens there, the status fails once every module is imported
+STATUS_HOST = 'http://127.0.0.1:9/gitlab'
+IMPORT_TIME_PREFIX = 'import time:'
+# out of the repository so no untracked file is left behind
+OUTPUT_FILE = os.path.join(tempfile.gettempdir(), 'merger-startup.json')
+
+StartupCommand = namedtuple('StartupCommand',
+                            ['name', 'script', 'arguments', 'budget_ms'])
+
+COMMANDS = (
+    StartupCommand('merger.py version', 'merger/merger.py', ['version'],
+                   120),
+    StartupCommand('call_git_server.py status',
+                   'callGitServer/call_git_server.py',
+                   ['status', '-t', 'token', '-s', 'success', '-c', 'HEAD',
+                    '-b', 'http://localhost/build', '-j', 'job',
+                    '-bid', '1', '-p', '1', '-r', STATUS_HOST],
+                   120),
+)
+
+
+def measure_imports(command):
+    ''' Runs the command with -X importtime, returns the total import
+        microseconds and the cumulative microseconds of each top level
+        import '''
+    script = os.path.join(ROOT, command.script)
+    process = subprocess.run([sys.executable, '-X', 'importtime', script,
+                              *command.arguments],
+                             cwd=os.path.dirname(script),
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE, check=False)
+    imports = {}
+    for line in process.stderr.decode('utf-8', 'replace').splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        _, cumulative, name = line[len(IMPORT_TIME_PREFIX):].split('|')
+        # nested imports are indented below the module importing them
+        if not cumulative.strip().isdigit() or name.startswith('  '):
+            continue
+        imports[name.strip()] = int(cumulative)
+    return sum(imports.values()), imports
+
+
+def benchmark_command(command, repeat, budget_factor, top):
+    ''' Measures the command, the best run is checked against the budget '''
+    runs = [measure_imports(command) for _ in range(repeat)]
+    total, imports = min(runs, key=lambda run: run[0])
+    budget_ms = command.budget_ms * budget_factor
+    slowest = sorted(imports.items(), key=lambda item: item[1],
+                     reverse=True)[:top]
+    return {'command': command.name,
+            'import_ms': round(total / 1000, 3),
+            'budget_ms': budget_ms,
+            'within_budget': total / 1000 <= budget_ms,
+            'runs_ms': [round(run[0] / 1000, 3) for run in runs],
+            'slowest_imports': [{'module': name,
+                                 'ms': round(microseconds / 1000, 3)}
+                                for name, microseconds in slowest]}
+
+
+def parse_args():
+    ''' Parse args '''
+    parser = argparse.ArgumentParser(description='Measures the import time '
+                                     'of the command line tools and checks '
+                                     'it against their budget')
+    parser.add_argument('-n', '--repeat', default=5, type=int,
+                        help='Runs of each command, the best one is '
+                             'checked, default=5')
+    parser.add_argument('-bf', '--budget-factor', default=1.0, type=float,
+                        help='Factor applied to every budget, for slower '
+                             'machines, default=1.0')
+    parser.add_argument('-t', '--top', default=5, type=int,
+                        help='Slowest top level imports reported, '
+                             'default=5')
+    parser.add_argument('-out', '--output', default=OUTPUT_FILE,
+                        help='JSON file for the results, '
+                             f'default=\'{OUTPUT_FILE}\'')
+    return parser.parse_args()
+
+
+def main():
+    ''' Main method '''
+    args = parse_args()
+    results = []
+    for command in COMMANDS:
+        print(f'Timing the imports of \'{command.name}\'')
+        results.append(benchmark_command(command, args.repeat,
+                                         args.budget_factor, args.top))
+    with open(args.output, 'w') as output_file:
+        json.dump({'python': sys.version.split()[0], 'results': results},
+                  output_file, indent=4)
+
+    for result in results:
+        status = 'ok' if result['within_budget'] else 'OVER BUDGET'
+        print(f'\t- {result["command"]}: {result["import_ms"]} ms of '
+              f'{result["budget_ms"]} ms, {status}')
+        for module in result['slowest_imports']:
+            print(f'\t    {module["module"]}: {module["ms"]} ms')
+    print(f'Results written in \'{args.output}\'')
+    if not all(result['within_budget'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+#!/usr/local/bin/python3
+''' Synthetic Salesforce repository generator for the merger benchmark '''
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+
+SOURCE_FOLDER = 'src'
+BASE_BRANCH = 'develop'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+NAMESPACE = 'http://soap.sforce.com/2006/04/metadata'
+
+DESCRIBE = {'metadataObjects': [
+    {'directoryName': 'classes', 'inFolder': False, 'metaFile': True,
+     'suffix': 'cls', 'xmlName': 'ApexClass'},
+    {'directoryName': 'objects', 'inFolder': False, 'metaFile': False,
+     'suffix': 'object', 'xmlName': 'CustomObject',
+     'childXmlNames': ['CustomField', 'ListView', 'ValidationRule',
+                       'RecordType']},
+    {'directoryName': 'profiles', 'inFolder': False, 'metaFile': False,
+     'suffix': 'profile', 'xmlName': 'Profile'},
+    {'directoryName': 'aura', 'inFolder': False, 'metaFile': False,
+     'xmlName': 'AuraDefinitionBundle'},
+    {'directoryName': 'lwc', 'inFolder': False, 'metaFile': False,
+     'xmlName': 'LightningComponentBundle'},
+    {'directoryName': 'staticresources', 'inFolder': False, 'metaFile': True,
+     'suffix': 'resource', 'xmlName': 'StaticResource'},
+]}
+
+
+class RepositoryShape:
+    ''' Size of the generated repository '''
+
+    def __init__(self, objects=50, fields=100, profiles=20, bundles=20,
+                 resources=10, resource_size=64 * 1024):
+        self.objects = objects
+        self.fields = fields
+        self.profiles = profiles
+        self.bundles = bundles
+        self.resources = resources
+        self.resource_size = resource_size
+
+    def to_dict(self):
+        ''' Returns the shape as a dict for the results '''
+        return dict(vars(self))
+
+
+class SyntheticRepository:
+    ''' Generates the files of a repository with a base commit and one
+        branch per change ratio, every branch changes that ratio of each
+        kind of component of the base '''
+
+    def __init__(self, path, shape, seed=0):
+        self.path = path
+        self.shape = shape
+        self.random = random.Random(seed)
+        self.field_labels = {}
+
+    def generate(self, change_ratios):
+        ''' Creates the repository, returns the base commit and the name of
+            the branch of each change ratio '''
+        os.makedirs(self.path)
+        self.__git('init', '-q')
+        self.__git('config', 'user.name', 'benchmark')
+        self.__git('config', 'user.email', 'benchmark@example.com')
+        self.__git('checkout', '-q', '-b', BASE_BRANCH)
+
+        self.__write('describe.log', json.dumps(DESCRIBE, indent=4))
+        self.__write_base()
+        base = self.__commit('Base metadata')
+
+        branches = {}
+        for ratio in change_ratios:
+            branch = f'delta-{ratio:g}'
+            self.__git('checkout', '-q', '-b', branch, base)
+            self.__write_changes(ratio)
+            self.__commit(f'Change {ratio:.0%} of the metadata')
+            branches[ratio] = branch
+
+        # an unrelated change so merges into the base branch are not empty
+        self.__git('checkout', '-q', BASE_BRANCH)
+        self.__write(f'{SOURCE_FOLDER}/classes/Unrelated.cls',
+                     'public class Unrelated {}\n')
+        self.__write(f'{SOURCE_FOLDER}/classes/Unrelated.cls-meta.xml',
+                     self.__class_meta())
+        self.__commit('Unrelated change')
+        return base, branches
+
+    def __write_base(self):
+        ''' Writes every component of the base commit '''
+        for object_index in range(self.shape.objects):
+            self.field_labels[object_index] = {
+                field_index: 'Base'
+                for field_index in range(self.shape.fields)}
+            self.__write_object(object_index)
+        for profile_index in range(self.shape.profiles):
+            self.__write_profile(profile_index, editable=True)
+        for bundle_index in range(self.shape.bundles):
+            self.__write_bundles(bundle_index, 'base')
+        for resource_index in range(self.shape.resources):
+            self.__write_resource(resource_index)
+        self.__write(f'{SOURCE_FOLDER}/classes/Base.cls',
+                     'public class Base {}\n')
+        self.__write(f'{SOURCE_FOLDER}/classes/Base.cls-meta.xml',
+                     self.__class_meta())
+
+    def __write_changes(self, ratio):
+        ''' Changes the ratio of the objects fields, profiles, bundles and
+            resources, a field of each changed object is added and other
+            one erased '''
+        objects = self.__sample(self.shape.objects, ratio)
+        for object_index in objects:
+            labels = dict(self.field_labels[object_index])
+            for field_index in self.__sample(self.shape.fields, ratio):
+                labels[field_index] = 'Changed'
+            labels.pop(self.shape.fields - 1, None)
+            labels[self.shape.fields] = 'Added'
+            self.__write_object(object_index, labels)
+        for profile_index in self.__sample(self.shape.profiles, ratio):
+            self.__write_profile(profile_index, editable=False)
+        for bundle_index in self.__sample(self.shape.bundles, ratio):
+            self.__write_bundles(bundle_index, 'changed')
+        for resource_index in self.__sample(self.shape.resources, ratio):
+            self.__write_resource(resource_index, changed=True)
+
+    def __write_object(self, object_index, labels=None):
+        ''' Writes a custom object with its fields '''
+        labels = labels or self.field_labels[object_index]
+        fields = ''.join(
+            f'    <fields>\n'
+            f'        <fullName>Field{field_index}__c</fullName>\n'
+            f'        <label>{label} {field_index}</label>\n'
+            f'        <length>255</length>\n'
+            f'        <type>Text</type>\n'
+            f'    </fields>\n'
+            for field_index, label in sorted(labels.items()))
+        content = (f'{XML_HEADER}<CustomObject xmlns="{NAMESPACE}">\n'
+                   f'    <deploymentStatus>Deployed</deploymentStatus>\n'
+                   f'{fields}'
+                   f'    <label>Object {object_index}</label>\n'
+                   f'    <nameField>\n'
+                   f'        <label>Name</label>\n'
+                   f'        <type>Text</type>\n'
+                   f'    </nameField>\n'
+                   f'    <pluralLabel>Objects {object_index}</pluralLabel>\n'
+                   f'    <searchLayouts></searchLayouts>\n'
+                   f'    <sharingModel>ReadWrite</sharingModel>\n'
+                   f'</CustomObject>\n')
+        object_name = self.__object_name(object_index)
+        self.__write(f'{SOURCE_FOLDER}/objects/{object_name}.object', content)
+
+    def __write_profile(self, profile_index, editable):
+        ''' Writes a profile with field permissions for every field '''
+        permissions = ''.join(
+            f'    <fieldPermissions>\n'
+            f'        <editable>{str(editable).lower()}</editable>\n'
+            f'        <field>{self.__object_name(object_index)}.'
+            f'Field{field_index}__c</field>\n'
+            f'        <readable>true</readable>\n'
+            f'    </fieldPermissions>\n'
+            for object_index in range(self.shape.objects)
+            for field_index in range(self.shape.fields))
+        content = (f'{XML_HEADER}<Profile xmlns="{NAMESPACE}">\n'
+                   f'    <custom>true</custom>\n'
+                   f'{permissions}'
+                   f'    <userLicense>Salesforce</userLicense>\n'
+                   f'</Profile>\n')
+        self.__write(f'{SOURCE_FOLDER}/profiles/Profile{profile_index}'
+                     f'.profile', content)
+
+    def __write_bundles(self, bundle_index, version):
+        ''' Writes an aura and a lwc bundle '''
+        aura = f'{SOURCE_FOLDER}/aura/auraCmp{bundle_index}'
+        self.__write(f'{aura}/auraCmp{bundle_index}.cmp',
+                     f'<aura:component><!-- {version} --></aura:component>\n')
+        self.__write(f'{aura}/auraCmp{bundle_index}Controller.js',
+                     f'({{ init: function() {{ /* {version} */ }} }})\n')
+        self.__write(f'{aura}/auraCmp{bundle_index}.cmp-meta.xml',
+                     self.__bundle_meta('AuraDefinitionBundle'))
+        lwc = f'{SOURCE_FOLDER}/lwc/lwcCmp{bundle_index}'
+        self.__write(f'{lwc}/lwcCmp{bundle_index}.js',
+                     f'export default class Cmp {{ /* {version} */ }}\n')
+        self.__write(f'{lwc}/lwcCmp{bundle_index}.html',
+                     '<template></template>\n')
+        self.__write(f'{lwc}/lwcCmp{bundle_index}.js-meta.xml',
+                     self.__bundle_meta('LightningComponentBundle'))
+
+    def __write_resource(self, resource_index, changed=False):
+        ''' Writes a binary static resource with its meta file '''
+        size = self.shape.resource_size
+        content = self.random.getrandbits(size * 8).to_bytes(size, 'little')
+        path = f'{SOURCE_FOLDER}/staticresources/Resource{resource_index}'
+        self.__write(f'{path}.resource', content)
+        if not changed:
+            self.__write(f'{path}.resource-meta.xml',
+                         f'{XML_HEADER}<StaticResource xmlns="{NAMESPACE}">\n'
+                         f'    <cacheControl>Private</cacheControl>\n'
+                         f'    <contentType>application/octet-stream'
+                         f'</contentType>\n'
+                         f'</StaticResource>\n')
+
+    def __sample(self, population, ratio):
+        ''' Returns the sorted indexes of the ratio of the population '''
+        size = min(population, math.ceil(population * ratio))
+        return sorted(self.random.sample(range(population), size))
+
+    @staticmethod
+    def __object_name(object_index):
+        return f'Object{object_index}__c'
+
+    @staticmethod
+    def __class_meta():
+        return (f'{XML_HEADER}<ApexClass xmlns="{NAMESPACE}">\n'
+                f'    <apiVersion>44.0</apiVersion>\n'
+                f'    <status>Active</status>\n'
+                f'</ApexClass>\n')
+
+    @staticmethod
+    def __bundle_meta(tag_name):
+        return (f'{XML_HEADER}<{tag_name} xmlns="{NAMESPACE}">\n'
+                f'    <apiVersion>44.0</apiVersion>\n'
+                f'</{tag_name}>\n')
+
+    def __write(self, filepath, content):
+        ''' Writes a file of the repository, creating its folders '''
+        filepath = os.path.join(self.path, filepath)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        mode = 'wb' if isinstance(content, bytes) else 'w'
+        with open(filepath, mode) as output_file:
+            output_file.write(content)
+
+    def __commit(self, message):
+        ''' Commits every file, returns the sha of the commit '''
+        self.__git('add', '-A')
+        self.__git('commit', '-q', '-m', message)
+        return self.__git('rev-parse', 'HEAD').strip()
+
+    def __git(self, *args):
+        return subprocess.run(['git', *args], cwd=self.path, check=True,
+                              stdout=subprocess.PIPE).stdout.decode('utf-8')
+
+
+def add_shape_arguments(parser):
+    ''' Adds the arguments of the repository shape to a parser '''
+    parser.add_argument('-o', '--objects', default=50, type=int,
+                        help='Number of custom objects, default=50')
+    parser.add_argument('-f', '--fields', default=100, type=int,
+                        help='Number of fields of each object, default=100')
+    parser.add_argument('-p', '--profiles', default=20, type=int,
+                        help='Number of profiles, with field permissions for '
+                             'every field, default=20')
+    parser.add_argument('-b', '--bundles', default=20, type=int,
+                        help='Number of aura and of lwc bundles, default=20')
+    parser.add_argument('-sr', '--resources', default=10, type=int,
+                        help='Number of static resources, default=10')
+    parser.add_argument('-rs', '--resource-size', default=64 * 1024, type=int,
+                        help='Size in bytes of each static resource, '
+                             'default=65536')
+    parser.add_argument('-cr', '--change-ratios', default=[0.01, 0.1, 0.5],
+                        type=float, nargs='+',
+                        help='Ratio of components changed by each branch, '
+                             'default=0.01 0.1 0.5')
+    parser.add_argument('--seed', default=0, type=int,
+                        help='Seed of the random generator, default=0')
+
+
+def get_shape(args):
+    ''' Returns the repository shape of the parsed arguments '''
+    return RepositoryShape(args.objects, args.fields, args.profiles,
+                           args.bundles, args.resources, args.resource_size)
+
+
+def main():
+    ''' Main method '''
+    parser = argparse.ArgumentParser(description='Generates a synthetic '
+                                     'Salesforce repository to benchmark the'
+                                     ' merger')
+    parser.add_argument('path', help='Folder of the repository, must not '
+                                     'exist')
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+    repository = SyntheticRepository(args.path, get_shape(args), args.seed)
+    base, branches = repository.generate(args.change_ratios)
+    print(f'Base commit {base} in \'{BASE_BRANCH}\'')
+    for ratio, branch in branches.items():
+        print(f'\t- {ratio:.0%} of the components changed in \'{branch}\'')
+
+
+if __name__ == '__main__':
+    main()
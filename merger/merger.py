@@ -1,13 +1,13 @@
 #!/usr/local/bin/python3
 ''' Merger module '''
+import os
 import sys
 
-from modules.create_release import (create_release, list_merge_commits,
-                                    list_merge_requests)
-from modules.delta_builder import build_delta, merge_delta
+from colorama import init
+
 from modules.git.utils import (is_commit_user_configured, is_git_repository,
                                is_valid_remote)
-from modules.utils import FATAL_LINE, SUCCESS_LINE, WARNING_LINE
+from modules.utils import FATAL_LINE, SUCCESS_LINE, WARNING_LINE, logger
 from modules.utils.argparser import parse_args
 from modules.utils.exceptions import (CommitUserNotConfigured,
                                       InvalidRemoteSpecified, MergerException,
@@ -21,14 +21,17 @@ def prevalidations(args):
     if not is_git_repository():
         raise NotAGitRepository()
 
-    if args.fetch and not is_valid_remote(args.remote):
+    if getattr(args, 'fetch', False) and not is_valid_remote(args.remote):
         if args.remote_specified:
             raise InvalidRemoteSpecified(args.remote)
-        print(f'{WARNING_LINE} Default remote \'{args.remote}\' does not '
-              'exist, forcing no fetch')
+        logger.warning(f'{WARNING_LINE} Default remote \'{args.remote}\' '
+                       'does not exist, forcing no fetch')
         args.fetch = False
 
-    if args.option == 'merge_delta' and not is_commit_user_configured():
+    # a merge in memory only commits if asked
+    if (args.option == 'merge_delta'
+            and (not args.in_memory or args.do_commit)
+            and not is_commit_user_configured()):
         raise CommitUserNotConfigured()
 
 
@@ -38,35 +41,86 @@ def main():
     if args.option == 'version':
         print(__version__)
         sys.exit(0)
+    init(autoreset=True)
+    log_level = (logger.DEBUG if args.verbose
+                 else logger.WARNING if args.quiet else logger.INFO)
+    logger.configure(log_level, args.log_format)
     try:
         prevalidations(args)
-        if args.option == 'list_mc':
-            list_merge_commits(args.source, args.columns, args.format)
-        elif args.option == 'list_mr':
-            list_merge_requests(args.source, args.target, args.token,
-                                args.remote, args.ssl_verify)
-        elif args.option == 'create_release':
-            create_release(args.version, args.target, args.remote, args.token,
-                           args.project_id, args.shas, args.iids,
-                           args.ssl_verify)
-        elif args.option == 'merge_delta':
-            merge_delta(args.source, args.target, args.remote,
-                        args.fetch, args.reset, args.delta_folder,
-                        args.source_folder, args.api_version,
-                        args.do_breakdown, args.print_tree, args.describe)
-            print(f'{SUCCESS_LINE} Build Delta Package Finished correctly')
-        elif args.option == 'build_delta':
-            build_delta(args.source, args.target, args.remote, args.fetch,
-                        args.delta_folder, args.source_folder,
-                        args.api_version, args.do_breakdown, args.print_tree,
-                        args.describe)
+        run_option(args)
     except MergerExceptionWarning as exception:
-        print(f'{WARNING_LINE} {exception}, finished with warnings...')
+        logger.warning(f'{WARNING_LINE} {exception}, finished with '
+                       'warnings...')
         sys.exit(exception.ERROR_CODE)
     except MergerException as exception:
-        print(f'{FATAL_LINE} {exception}, exiting...')
+        logger.error(f'{FATAL_LINE} {exception}, exiting...')
         sys.exit(exception.ERROR_CODE)
 
 
+def run_option(args):
+    ''' Runs the selected option, the modules of each option are imported
+        only when it runs, so the startup only pays for the option used.
+        With a worktree pool the option runs in a worktree leased from the
+        pool, the relative outputs are written in the folder of the job '''
+    # pylint: disable=C0415
+    if getattr(args, 'worktree_pool', 0) > 0:
+        from modules.git.worktrees import WorktreePool, get_job_folder
+        job_folder = get_job_folder(args.jobs_folder, args.job_name)
+        args.delta_folder = os.path.join(job_folder, args.delta_folder)
+        args.artifacts_folder = os.path.join(job_folder,
+                                             args.artifacts_folder)
+        args.describe = os.path.abspath(args.describe)
+        with WorktreePool(args.worktree_pool).lease():
+            run_job(args)
+    else:
+        run_job(args)
+
+
+def run_job(args):
+    ''' Runs the selected option in the current folder '''
+    # pylint: disable=C0415
+    detach = getattr(args, 'worktree_pool', 0) > 0
+    if args.option == 'list_mc':
+        from modules.create_release import list_merge_commits
+        list_merge_commits(args.source, args.columns, args.format)
+    elif args.option == 'list_mr':
+        from modules.create_release import list_merge_requests
+        list_merge_requests(args.source, args.target, args.token,
+                            args.remote, args.ssl_verify)
+    elif args.option == 'create_release':
+        from modules.create_release import create_release
+        create_release(args.version, args.target, args.remote, args.token,
+                       args.project_id, args.shas, args.iids,
+                       args.ssl_verify)
+    elif args.option == 'merge_delta':
+        from modules.delta_builder import merge_delta
+        merge_delta(args.source, args.target, args.remote,
+                    args.fetch, args.reset, args.delta_folder,
+                    args.source_folder, args.api_version,
+                    args.do_breakdown, args.print_tree, args.describe,
+                    args.jobs, args.rename_threshold, args.copy_threshold,
+                    args.copy_mode, args.io_threads, args.plan,
+                    args.profile, args.lazy_report,
+                    args.max_components, args.in_memory, args.do_commit,
+                    args.artifacts_folder, detach)
+        logger.info(f'{SUCCESS_LINE} Build Delta Package Finished '
+                    'correctly')
+    elif args.option == 'build_delta':
+        from modules.delta_builder import build_delta
+        build_delta(args.source, args.target, args.remote, args.fetch,
+                    args.delta_folder, args.source_folder,
+                    args.api_version, args.do_breakdown, args.print_tree,
+                    args.describe, args.jobs, args.rename_threshold,
+                    args.copy_threshold, args.do_checkout,
+                    args.copy_mode, args.io_threads, args.environment,
+                    args.plan,
+                    args.profile, args.lazy_report,
+                    args.max_components, args.artifacts_folder, detach)
+    elif args.option == 'record_deploy':
+        from modules.git.deployments import record_deployment
+        record_deployment(args.environment, args.source, args.remote,
+                          args.push)
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,77 @@
+''' Copy Plan '''
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.utils import get_parents_destination
+
+
+class CopyPlan:
+    ''' Collects the copies requested while classifying the differences,
+        deduplicated by destination, to run them afterwards in a pool '''
+
+    def __init__(self, files):
+        self.files = files
+        self.__pairs = {}
+        self.__tree_files = {}
+        self.__trees = set()
+
+    def __len__(self):
+        return len(self.__pairs) + len(self.__tree_files)
+
+    def is_dir(self, path):
+        ''' Returns true if the path is a folder in the files source '''
+        return self.files.is_dir(path)
+
+    def copy_parents(self, src, dest_folder, dir_offset=0):
+        ''' Plans the copy of the file and its meta file keeping the
+            parent folders, both are copied by the same task '''
+        src, dest_file_path = get_parents_destination(src, dest_folder,
+                                                      dir_offset)
+        self.__pairs.setdefault(dest_file_path, src)
+
+    def copy_tree(self, src, dest):
+        ''' Plans the copy of a whole folder, only once per destination '''
+        if dest in self.__trees:
+            return
+        self.__trees.add(dest)
+        for filepath in self.files.list_files(src):
+            self.__tree_files.setdefault(f'{dest}/{filepath[len(src) + 1:]}',
+                                         filepath)
+
+    def get_sizes(self):
+        ''' Returns the size of each file the plan would copy, without
+            copying them '''
+        sources = ([filepath for src in self.__pairs.values()
+                    for filepath in (src, f'{src}-meta.xml')]
+                   + list(self.__tree_files.values()))
+        return self.files.get_sizes(sources)
+
+    def execute(self, threads=1):
+        ''' Creates every destination folder once and copies the files with
+            a pool of the passed number of threads '''
+        folders = {os.path.dirname(dest)
+                   for dest in list(self.__pairs) + list(self.__tree_files)}
+        for folder in sorted(folders):
+            os.makedirs(folder, exist_ok=True)
+
+        tasks = ([(self.__copy_pair, src, dest)
+                  for dest, src in self.__pairs.items()]
+                 + [(self.files.copy_file, src, dest)
+                    for dest, src in self.__tree_files.items()])
+        if threads <= 1:
+            for task in tasks:
+                self.__run_task(task)
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(executor.map(self.__run_task, tasks))
+
+    def __copy_pair(self, src, dest):
+        ''' Copies a file together with its meta file '''
+        self.files.copy_file(src, dest)
+        self.files.copy_file(f'{src}-meta.xml', f'{dest}-meta.xml')
+
+    @staticmethod
+    def __run_task(task):
+        ''' Runs a planned copy task '''
+        function, *args = task
+        function(*args)
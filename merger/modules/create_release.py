@@ -2,7 +2,8 @@
 from modules.git import checkout, cherry_pick, create_branch, fetch
 from modules.git.models import MergeCommit
 from modules.git.remote import get_merge_requests, get_project_id
-from modules.utils import INFO_TAG, call_subprocess, print_key_value_list
+from modules.utils import (INFO_TAG, call_subprocess, logger,
+                           print_key_value_list)
 from modules.utils.models import OutputType
 
 
@@ -10,11 +11,11 @@ def list_merge_requests(source_branch, target_branch, token,
                         remote, ssl_verify):
     ''' Returns a list of valid merge requests from source to target branch '''
     project_id = get_project_id(token, ssl_verify)
-    print(f'{INFO_TAG} Current Project Id: {project_id}')
+    logger.info(f'{INFO_TAG} Current Project Id: {project_id}')
     merge_requests = get_merge_requests(project_id, token, source_branch, 0,
                                         25, ssl_verify).values()
-    print(f'{INFO_TAG} Found {len(merge_requests)} Merge Requests with '
-          f'\'merged\' state to target \'{source_branch}\'')
+    logger.info(f'{INFO_TAG} Found {len(merge_requests)} Merge Requests with '
+                f'\'merged\' state to target \'{source_branch}\'')
     return __filter_merge_requests(merge_requests, target_branch, remote)
 
 
@@ -31,9 +32,10 @@ def __filter_merge_requests(merge_requests, target_branch, remote):
     merge_requests = [merge_request for merge_request in merge_requests
                       if merge_request.sha not in hashes]
 
-    print(f'{INFO_TAG} {len(merge_requests)} Merge Requests after filtering')
+    logger.info(f'{INFO_TAG} {len(merge_requests)} Merge Requests after '
+                'filtering')
     for merge_request in merge_requests:
-        print(f'\t-{merge_request}')
+        logger.result(f'\t-{merge_request}')
     return merge_requests
 
 
@@ -48,7 +50,7 @@ def list_merge_commits(source_branch, columns, output_type):
         row_separator += '\n'
     whole_output = (f'{MergeCommit.get_header(columns, output_type)}\n'
                     f'{row_separator}{commits_string}')
-    print(whole_output)
+    logger.result(whole_output)
 
 
 def create_release(version, target, remote, token, project_id=None,
@@ -81,6 +83,6 @@ def get_shas_for_iids(token, iids, target, project_id=None, ssl_verify=False):
         raise Exception('We are currently working at this sorry...')
 
     shas = {iid: merge_requests[iid].sha for iid in iids}
-    print(f'{INFO_TAG} SHAs obtainer from iid {shas}')
+    logger.info(f'{INFO_TAG} SHAs obtainer from iid {shas}')
 
     return shas.values()
@@ -1,104 +1,249 @@
 ''' Delta Builder '''
+import json
 import os
-import re
 import shutil
-
-import jinja2
-from jinja2.exceptions import TemplateNotFound
-
-from modules.git import checkout, fetch, prepare_and_merge
-from modules.parser import IMPLEMENTED_CHILD, parse_file
-from modules.utils import (ERROR_TAG, INFO_TAG, PWD, TEMPLATE_FILE,
-                           WARNING_TAG, call_subprocess, check_exist,
-                           copy_parents, get_first_set_value, get_xml_names,
-                           pprint_xml, remove_file, write_file)
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from lxml import etree
+
+from modules.copy_plan import CopyPlan
+from modules.deploy_units import (MAX_COMPONENTS, clean_deploy_units,
+                                  split_deploy_units, write_deploy_units)
+from modules.git import (checkout, commit_merge_tree, fetch,
+                         prepare_and_merge, prepare_and_merge_tree)
+from modules.git.blob_reader import BlobReader
+from modules.git.deployments import fetch_watermarks, resolve_watermark
+from modules.git.trees import RevisionTree, WorkingTree
+from modules.git.utils import iter_name_status
+from modules.parser import IMPLEMENTED_CHILD, parse_changed
+from modules.utils import (ARTIFACTS_FOLDER, ERROR_TAG, INFO_TAG,
+                           TEMPLATE_FILE, WARNING_TAG, check_exist,
+                           get_first_set_value, get_xml_names, open_file,
+                           write_file)
 from modules.utils.exceptions import (InvalidPath, NoDifferencesException,
                                       NotControlledFoldersFound)
+from modules.utils import logger
+from modules.utils.copiers import get_copier
 from modules.utils.models import ChangeType
-from modules.utils.reporter import get_tree_string
+from modules.utils.reporter import ConsoleSink, TextSink, write_tree
+from modules.utils.timings import PROFILE_FILE, PhaseTimer, call_profiled
+
+METADATA_NAMESPACE = 'http://soap.sforce.com/2006/04/metadata'
+# Folders deployed as a whole, any change in them adds the full bundle
+BUNDLE_FOLDERS = frozenset(('aura', 'lwc', 'experiences', 'waveTemplates'))
+# Folders of models with subfolders that are metadata types on their own
+NESTED_MODEL_FOLDERS = {
+    'territory2Models': {'rules': 'territory2Rule',
+                         'territories': 'territory2'},
+}
+
+Difference = namedtuple('Difference', ['status', 'filename', 'folder',
+                                       'apiname', 'definition'])
+HandlerContext = namedtuple('HandlerContext', ['delta_folder', 'builders',
+                                               'xml_names', 'source_folder',
+                                               'do_breakdown', 'source_ref',
+                                               'target_ref', 'blob_reader',
+                                               'breakdowns', 'copy_plan',
+                                               'plan'])
 
 
 def merge_delta(source, target, remote, do_fetch, reset, delta_folder,
                 source_folder, api_version, do_breakdown, print_tree,
-                describepath='describe.log'):
-    ''' Builds delta package in the destination folder '''
-    print(f'{INFO_TAG} Clean up target folder \'{delta_folder}\'')
-    shutil.rmtree(delta_folder, ignore_errors=True, onerror=None)
-    os.makedirs(delta_folder)
-
-    print(f'{INFO_TAG} Extracting metadata types from \'{describepath}\'')
+                describepath='describe.log', jobs=1, rename_threshold=None,
+                copy_threshold=None, copy_mode='copy', io_threads=8,
+                plan=False, profile=False, lazy_report=False,
+                max_components=MAX_COMPONENTS, in_memory=False,
+                do_commit=False, artifacts_folder=ARTIFACTS_FOLDER,
+                detach=False):
+    ''' Builds delta package in the destination folder, if plan is enabled
+        only a summary of the delta is written and the branches are merged
+        in memory, nothing is checked out nor committed. The timings of each
+        phase are written in the artifacts folder, with the cProfile stats of
+        the differences handling if profile is enabled. If lazy_report is
+        enabled the HTML report loads its snippets from a sidecar. Deltas
+        above max_components are also split into deploy units. If in_memory
+        is enabled the branches are merged with git merge-tree and the files
+        are written from the merged tree, nothing is checked out and the
+        merge commit is only created if do_commit is enabled. Reports are
+        written in artifacts_folder, if detach is enabled the branches are
+        checked out detached, as in the worktrees of a pool '''
+    timer = PhaseTimer('merge_delta')
+    # a plan never touches the repository
+    in_memory = in_memory or plan
+    if not plan:
+        timer.start('clean')
+        __clean_delta_folder(delta_folder)
+
+    timer.start('describe')
+    logger.info(f'{INFO_TAG} Extracting metadata types from '
+                f'\'{describepath}\'')
     xml_names = get_xml_names(describepath)
 
-    print(f'{INFO_TAG} Preparing to merge \'{source}\' into \'{target}\'')
-    prepare_and_merge(source, target, remote, do_fetch, reset)
-
-    print(f'{INFO_TAG} Getting differences')
-    differences = get_differences(source_folder, 'HEAD', 'HEAD~1')
-
-    print(f'{INFO_TAG} Handling a total of {len(differences)} differences')
-    builder = __handle_differences(differences, delta_folder, api_version,
-                                   xml_names, source_folder, do_breakdown,
-                                   'HEAD', 'HEAD~1')
-
-    print(f'\n{INFO_TAG} Generating Packages')
-    builder.build_xmls()
-
-    print(f'\n{INFO_TAG} Generated Delta')
-    builder.build_tree(print_tree)
-    builder.build_html(differences)
-
-    print()
-    if builder.get_errors():
-        raise NotControlledFoldersFound(builder.get_errors())
+    timer.start('merge')
+    logger.info(f'{INFO_TAG} Preparing to merge \'{source}\' into '
+                f'\'{target}\'')
+    source_ref, target_ref = 'HEAD', 'HEAD~1'
+    if in_memory:
+        merged = prepare_and_merge_tree(source, target, remote, do_fetch,
+                                        reset)
+        source_ref, target_ref = merged.tree, merged.target
+    else:
+        prepare_and_merge(source, target, remote, do_fetch, reset, detach)
+
+    timer.start('diff')
+    logger.info(f'{INFO_TAG} Getting differences')
+    differences = get_differences(source_folder, source_ref, target_ref,
+                                  rename_threshold, copy_threshold)
+
+    timer.start('handle_differences')
+    logger.info(f'{INFO_TAG} Handling a total of {len(differences)} '
+                'differences')
+    with BlobReader() as blob_reader:
+        files = (RevisionTree(source_ref, blob_reader) if in_memory
+                 else WorkingTree(get_copier(copy_mode)))
+        builder = call_profiled(__get_profile_path(profile,
+                                                   artifacts_folder),
+                                __handle_differences, differences,
+                                delta_folder, api_version, xml_names,
+                                source_folder, do_breakdown, source_ref,
+                                target_ref, blob_reader, jobs, files,
+                                io_threads, plan)
+
+    if in_memory and do_commit and not plan:
+        timer.start('commit')
+        commit_merge_tree(merged, source, target)
+    __build_outputs(builder, files, differences, print_tree, plan, timer,
+                    lazy_report, max_components, artifacts_folder)
 
 
 def build_delta(source_ref, target_ref, remote, do_fetch, delta_folder,
                 source_folder, api_version, do_breakdown, print_tree,
-                describepath='describe.log'):
-    ''' Builds delta package in the destination folder '''
-    print(f'{INFO_TAG} Clean up target folder \'{delta_folder}\'')
-    shutil.rmtree(delta_folder, ignore_errors=True, onerror=None)
-    os.makedirs(delta_folder)
-
-    print(f'{INFO_TAG} Extracting metadata types from \'{describepath}\'')
+                describepath='describe.log', jobs=1, rename_threshold=None,
+                copy_threshold=None, do_checkout=True, copy_mode='copy',
+                io_threads=8, environment=None, plan=False, profile=False,
+                lazy_report=False, max_components=MAX_COMPONENTS,
+                artifacts_folder=ARTIFACTS_FOLDER, detach=False):
+    ''' Builds delta package in the destination folder, if do_checkout is
+        disabled the files are written from the git objects of the source
+        ref and the working tree is not touched. If an environment is passed
+        and no target ref, the delta starts at the last deployment recorded
+        for the environment, recorded by record_deployment once the delta
+        is deployed. If plan is enabled nothing is checked out nor written
+        but a summary of the delta. The timings of each phase are written in
+        the artifacts folder, with the cProfile stats of the differences
+        handling if profile is enabled. If lazy_report is enabled the HTML
+        report loads its snippets from a sidecar. Deltas above
+        max_components are also split into deploy units. Reports are written
+        in artifacts_folder, if detach is enabled the source is checked out
+        detached, as in the worktrees of a pool '''
+    timer = PhaseTimer('build_delta')
+    if not plan:
+        timer.start('clean')
+        __clean_delta_folder(delta_folder)
+
+    timer.start('describe')
+    logger.info(f'{INFO_TAG} Extracting metadata types from '
+                f'\'{describepath}\'')
     xml_names = get_xml_names(describepath)
 
+    timer.start('fetch')
     if do_fetch:
-        print(f'{INFO_TAG} Fetching from \'{remote}\'')
+        logger.info(f'{INFO_TAG} Fetching from \'{remote}\'')
         fetch(remote)
+        if environment:
+            fetch_watermarks(remote)
+    else:
+        logger.info(f'{INFO_TAG} Not fetching, using current local status')
+
+    if not target_ref:
+        target_ref = resolve_watermark(environment, source_ref)
+
+    timer.start('checkout')
+    if do_checkout and not plan:
+        logger.info(f'{INFO_TAG} Checking out source ref \'{source_ref}\'')
+        checkout(source_ref, remote, reset=False, detach=detach)
     else:
-        print(f'{INFO_TAG} Not fetching, using current local status')
+        logger.info(f'{INFO_TAG} Not checking out, reading files from '
+                    f'\'{source_ref}\'')
+
+    timer.start('diff')
+    logger.info(f'{INFO_TAG} Getting differences')
+    differences = get_differences(source_folder, source_ref, target_ref,
+                                  rename_threshold, copy_threshold)
+
+    timer.start('handle_differences')
+    logger.info(f'{INFO_TAG} Handling a total of {len(differences)} '
+                'differences')
+    with BlobReader() as blob_reader:
+        files = (WorkingTree(get_copier(copy_mode))
+                 if do_checkout and not plan
+                 else RevisionTree(source_ref, blob_reader))
+        builder = call_profiled(__get_profile_path(profile,
+                                                   artifacts_folder),
+                                __handle_differences, differences,
+                                delta_folder, api_version, xml_names,
+                                source_folder, do_breakdown, source_ref,
+                                target_ref, blob_reader, jobs, files,
+                                io_threads, plan)
+    __build_outputs(builder, files, differences, print_tree, plan, timer,
+                    lazy_report, max_components, artifacts_folder)
+
+
+def __get_profile_path(profile, report_folder=ARTIFACTS_FOLDER):
+    ''' Returns the path of the cProfile stats if profile is enabled '''
+    return f'{report_folder}/{PROFILE_FILE}' if profile else None
+
+
+def __clean_delta_folder(delta_folder):
+    ''' Removes and creates again the delta folder '''
+    logger.info(f'{INFO_TAG} Clean up target folder \'{delta_folder}\'')
+    shutil.rmtree(delta_folder, ignore_errors=True, onerror=None)
+    os.makedirs(delta_folder)
 
-    print(f'{INFO_TAG} Checking out source ref \'{source_ref}\'')
-    checkout(source_ref, remote, reset=False)
 
-    print(f'{INFO_TAG} Getting differences')
-    differences = get_differences(source_folder, source_ref, target_ref)
+def __build_outputs(builder, files, differences, print_tree, plan, timer,
+                    lazy_report=False, max_components=MAX_COMPONENTS,
+                    report_folder=ARTIFACTS_FOLDER):
+    ''' Writes the packages and reports of the delta, or only the summary
+        of the delta if plan is enabled, then the timings of the run '''
+    if plan:
+        timer.start('build_plan')
+        logger.info(f'\n{INFO_TAG} Planned Delta')
+        builder.build_plan(len(differences), report_folder)
+    else:
+        logger.info(f'{INFO_TAG} {files.get_summary()}')
 
-    print(f'{INFO_TAG} Handling a total of {len(differences)} differences')
-    builder = __handle_differences(differences, delta_folder, api_version,
-                                   xml_names, source_folder, do_breakdown,
-                                   source_ref, target_ref)
+        timer.start('build_xmls')
+        logger.info(f'\n{INFO_TAG} Generating Packages')
+        builder.build_xmls(max_components, report_folder)
 
-    print(f'\n{INFO_TAG} Generating Packages')
-    builder.build_xmls()
+        timer.start('build_tree')
+        logger.info(f'\n{INFO_TAG} Generated Delta')
+        builder.build_tree(print_tree, report_folder)
 
-    print(f'\n{INFO_TAG} Generated Delta')
-    builder.build_tree(print_tree)
-    builder.build_html(differences)
+        timer.start('build_html')
+        builder.build_html(differences, lazy_report, report_folder)
 
-    print()
+    timer.write(report_folder)
+    logger.info()
     if builder.get_errors():
         raise NotControlledFoldersFound(builder.get_errors())
 
 
-def get_differences(source_folder, source, target):
-    ''' Extract the differences between two references '''
-    diff_command = f'git diff --name-status {target} {source}'
-    output, _ = call_subprocess(diff_command)
-
-    regex_string = r'([A-Z0-9]+)\t*({}\/[a-zA-Z0-9]+\/.+)'.format(source_folder)
-    differences = re.findall(regex_string, output)
+def get_differences(source_folder, source, target, rename_threshold=None,
+                    copy_threshold=None):
+    ''' Extract the differences between two references, renames and copies
+        are returned with a tuple (origin, destination) as filename '''
+    prefix = f'{source_folder}/'
+    differences = []
+    for status, paths in iter_name_status(source, target, source_folder,
+                                          rename_threshold, copy_threshold):
+        # only files inside a metadata folder of the source folder
+        path = paths[-1]
+        if not path.startswith(prefix) or '/' not in path[len(prefix):]:
+            continue
+        differences.append((status, paths if len(paths) > 1 else paths[0]))
 
     if not differences:
         raise NoDifferencesException(source_folder)
@@ -110,143 +255,217 @@ def get_differences(source_folder, source, target):
 
 
 def __handle_differences(differences, delta_folder, api_version, xml_names,
-                         source_folder, do_breakdown, source_ref, target_ref):
+                         source_folder, do_breakdown, source_ref, target_ref,
+                         blob_reader=None, jobs=1, files=None,
+                         io_threads=1, plan=False):
     ''' Handles a list of differences copying the files into the
-        delta folder '''
+        delta folder, breakdowns are run in a process pool if jobs > 1.
+        The differences are classified first into a copy plan, then the
+        plan is copied from the files source (working tree by default)
+        with a pool of io_threads threads. If plan is enabled only the
+        size of the copies and breakdowns is added to the builders '''
     builders = Builders(delta_folder, api_version, xml_names)
-    for status, filename in differences:
+    copy_plan = CopyPlan(files or WorkingTree())
+    differences = __split_differences(differences, source_folder, xml_names)
+    context = HandlerContext(delta_folder, builders, xml_names, source_folder,
+                             do_breakdown, source_ref, target_ref,
+                             blob_reader, {}, copy_plan, plan)
+    if not do_breakdown or jobs <= 1:
+        __handle_differences_loop(differences, context,
+                                  get_folder_handlers(xml_names))
+        __copy_files(copy_plan, io_threads, builders, plan)
+        return builders
+
+    logger.flush()  # forked workers must not inherit buffered records
+    with ProcessPoolExecutor(max_workers=jobs,
+                             initializer=__init_breakdown_worker,
+                             initargs=(logger.get_level(),)) as executor:
+        context.breakdowns.update({
+            difference.filename: executor.submit(__breakdown_worker,
+                                                 delta_folder,
+                                                 difference.filename,
+                                                 difference.definition,
+                                                 source_ref, target_ref, plan)
+            for difference in differences
+            if difference.status == 'M' and __is_breakdown(difference)})
+        __handle_differences_loop(differences, context,
+                                  get_folder_handlers(xml_names))
+    __copy_files(copy_plan, io_threads, builders, plan)
+    return builders
 
-        folder, apiname = splitFolderApiname( source_folder, filename )
-        xml_definition = xml_names.get(folder, None)
-        if not xml_definition:
-            print( f'Warning : {folder} not in describe' )
-            continue
 
+def __copy_files(copy_plan, io_threads, builders, plan=False):
+    ''' Runs the copies of the plan, or only sizes them if plan is
+        enabled '''
+    if plan:
+        sizes = copy_plan.get_sizes()
+        builders.add_planned_files(len(sizes), sum(sizes.values()))
+        return
+    logger.info(f'{INFO_TAG} Copying {len(copy_plan)} files with {io_threads} '
+                f'thread(s)')
+    copy_plan.execute(io_threads)
+
+
+def __split_differences(differences, source_folder, xml_names):
+    ''' Splits the path of every difference once, renames are handled as
+        a deletion and a creation and copies as a creation, both after
+        the rest of the differences '''
+    expanded = []
+    for status, filename in differences:
         if status.startswith('R'):
-            __handle_rename(differences, filename)
+            expanded.append(('D', filename[0]))
+            expanded.append(('A', filename[1]))
+        elif status.startswith('C'):
+            expanded.append(('A', filename[1]))
+    split = []
+    for status, filename in differences + expanded:
+        if status.startswith('R') or status.startswith('C'):
             continue
-        
-        if filename.startswith(f'{source_folder}/aura/') or filename.startswith(f'{source_folder}/lwc/'):
-            __handle_aura_folder(source_folder, filename, delta_folder, builders)
-
-        elif filename.startswith(f'{source_folder}/territory2Models/'):
-            __handle_territoryModels_folder(source_folder, filename, delta_folder, builders, status)
-
-        elif status == 'A':
-            __handle_creation(source_folder, filename, delta_folder, builders, xml_names)
-        elif status == 'M':
-            __handle_modification(source_folder, filename, delta_folder,
-                                  builders, xml_names, do_breakdown,
-                                  source_ref, target_ref)
-        elif status == 'D':
-            __handle_deletion(filename, builders, source_folder, xml_names)
-    return builders
+        folder, apiname = splitFolderApiname(source_folder, filename)
+        split.append(Difference(status, filename, folder, apiname,
+                                xml_names.get(folder, None)))
+    return split
+
+
+def __handle_differences_loop(differences, context, handlers):
+    ''' Handles each difference in order with the handler of its folder,
+        breakdowns already submitted to a pool are merged into the
+        builders when their turn comes '''
+    for difference in differences:
+        handler = handlers.get(difference.folder, None)
+        if not handler or not difference.definition:
+            logger.warning(f'Warning : {difference.folder} not in describe')
+            continue
+        handler(context, difference)
+
+
+def get_folder_handlers(xml_names):
+    ''' Maps every folder of the describe to the handler of its changes '''
+    handlers = {}
+    for folder in xml_names:
+        if folder in BUNDLE_FOLDERS:
+            handlers[folder] = __handle_bundle_folder
+        elif folder in NESTED_MODEL_FOLDERS:
+            handlers[folder] = __handle_nested_model_folder
+        else:
+            handlers[folder] = __handle_metadata_file
+    return handlers
+
 
-def __handle_creation(source_folder, filename, delta_folder, builders, xml_names):
+def __handle_metadata_file(context, difference):
+    ''' Handles the change of a regular metadata file by its status '''
+    status_handler = __STATUS_HANDLERS.get(difference.status, None)
+    if status_handler:
+        status_handler(context, difference)
+
+
+def __handle_creation(context, difference):
     ''' Method for handling creation '''
-    folder, apiname = splitFolderApiname( source_folder, filename )
-    xml_definition = xml_names.get(folder, None)
+    folder, apiname = difference.folder, difference.apiname
+    xml_definition = difference.definition
 
     if '/' in apiname:
         #folderMeta = apiname.split( '/' )[ 0 ]
         #builders.add_change(folder, folderMeta, ChangeType.MODIFICATION)
-        copy_parents(filename, delta_folder, 1)
-        builders.add_change(folder, apiname, ChangeType.MODIFICATION)
+        context.copy_plan.copy_parents(difference.filename,
+                                       context.delta_folder, 1)
+        context.builders.add_change(folder, apiname, ChangeType.MODIFICATION)
     elif '-meta.xml' in apiname and xml_definition and getattr( xml_definition, "in_folder" ):
         apiname = apiname[ : -len( '-meta.xml' ) ]
-        copy_parents(filename, delta_folder, 1)
-        builders.add_change(folder, apiname, ChangeType.CREATION)
+        context.copy_plan.copy_parents(difference.filename,
+                                       context.delta_folder, 1)
+        context.builders.add_change(folder, apiname, ChangeType.CREATION)
     else:
-        copy_parents(filename, delta_folder, 1)
-        builders.add_change(folder, apiname, ChangeType.CREATION)
+        context.copy_plan.copy_parents(difference.filename,
+                                       context.delta_folder, 1)
+        context.builders.add_change(folder, apiname, ChangeType.CREATION)
 
-def __handle_modification(source_folder, filename, delta_folder, builders,
-                          xml_names, do_breakdown, source_ref, target_ref):
+def __handle_modification(context, difference):
     ''' Method for handling modification '''
-    folder, apiname = splitFolderApiname( source_folder, filename )
-    xml_definition = xml_names.get(folder, None)
+    filename = difference.filename
+    folder, apiname = difference.folder, difference.apiname
+    xml_definition = difference.definition
+    breakdown = context.breakdowns.get(filename)
     # Check if modified file is an implemented compound object
     
-    print( f'filename {filename}' )
-    print( do_breakdown )
-    print( xml_definition )
-    print( xml_definition.child_objects )
-    print( xml_definition.xml_name )
-
-    if (do_breakdown and xml_definition and xml_definition.xml_name in IMPLEMENTED_CHILD):
-        __extract_differences(delta_folder, filename, xml_definition, builders,
-                              source_ref, target_ref)
+    logger.debug('Handling modification of %s as %s, breakdown %s',
+                 filename, xml_definition, context.do_breakdown)
+
+    if breakdown:
+        recorder, records = breakdown.result()
+        logger.replay(records)
+        recorder.replay(context.builders)
+    elif (context.do_breakdown and xml_definition and xml_definition.xml_name in IMPLEMENTED_CHILD):
+        __extract_differences(context.delta_folder, filename, xml_definition,
+                              context.builders, context.source_ref,
+                              context.target_ref, context.blob_reader,
+                              context.plan)
     elif '/' in apiname:
-        folderMeta  = apiname.split( '/' )[ 0 ]
-        copy_parents(filename, delta_folder, 1)
-        builders.add_change(folder, apiname, ChangeType.MODIFICATION)
+        context.copy_plan.copy_parents(filename, context.delta_folder, 1)
+        context.builders.add_change(folder, apiname, ChangeType.MODIFICATION)
     elif '-meta.xml' in apiname and xml_definition and getattr( xml_definition, "in_folder" ):
         apiname = apiname[ : -len( '-meta.xml' ) ]
-        copy_parents(filename, delta_folder, 1)
-        builders.add_change(folder, apiname, ChangeType.MODIFICATION)
+        context.copy_plan.copy_parents(filename, context.delta_folder, 1)
+        context.builders.add_change(folder, apiname, ChangeType.MODIFICATION)
     else:
-        copy_parents(filename, delta_folder, 1)
-        builders.add_change(folder, apiname, ChangeType.MODIFICATION)
+        context.copy_plan.copy_parents(filename, context.delta_folder, 1)
+        context.builders.add_change(folder, apiname, ChangeType.MODIFICATION)
 
 
-def __handle_deletion(filename, builder, source_folder, xml_names):
+def __handle_deletion(context, difference):
     ''' Method for handling deletions '''
-    folder, apiname = splitFolderApiname( source_folder, filename )
-    xml_definition = xml_names.get(folder, None)
+    folder, apiname = difference.folder, difference.apiname
+    xml_definition = difference.definition
     if '-meta.xml' in apiname and xml_definition and getattr( xml_definition, "in_folder" ):
         apiname = apiname[ : -len( '-meta.xml' ) ]
-    builder.add_change(folder, apiname, ChangeType.DELETION)
+    context.builders.add_change(folder, apiname, ChangeType.DELETION)
 
 
-def __handle_rename(differences, filename):
-    ''' Method for handling renames '''
-    source, target = filename.split('\t')
-    differences.append(('D', source))
-    differences.append(('A', target))
+__STATUS_HANDLERS = {
+    'A': __handle_creation,
+    'M': __handle_modification,
+    'D': __handle_deletion,
+}
 
 
-def __handle_aura_folder(source_folder, filename, delta_folder, builders):
-    ''' Handles the specific case of changes in an aura folder when
-        it is necessary to add all the aura folder '''
-    folder, apiname = get_folder_apiname(source_folder, filename)
-    aura_folder_path = f'{source_folder}/{folder}/{apiname}'
-    if os.path.isdir(aura_folder_path):  # modified or created aura
-        builders.add_change(folder, apiname, ChangeType.MODIFICATION)
+def __handle_bundle_folder(context, difference):
+    ''' Handles the specific case of changes in a bundle folder (aura, lwc,
+        ...) when it is necessary to add all the bundle folder '''
+    folder, apiname = difference.folder, difference.apiname
+    if '/' in apiname:
+        apiname = apiname.split('/', 1)[0]
+    else:  # file next to the bundle folder, as the meta of experiences
+        apiname = apiname.split('.', 1)[0]
+        if difference.status != 'D':
+            context.copy_plan.copy_parents(difference.filename,
+                                           context.delta_folder, 1)
+    bundle_folder_path = f'{context.source_folder}/{folder}/{apiname}'
+    if context.copy_plan.is_dir(bundle_folder_path):  # modified or created
+        context.builders.add_change(folder, apiname, ChangeType.MODIFICATION)
         # build dest path (add dest folder cut 'src' folder)
-        dest = f'{delta_folder}/{folder}/{apiname}'
-        try:
-            shutil.copytree(aura_folder_path, dest)
-        except FileExistsError:  # if already exits, dont do anything
-            pass
-    else:  # erased aura
-        builders.add_change(folder, apiname, ChangeType.DELETION)
-
-
-def __handle_territoryModels_folder(source_folder, filename, delta_folder, builders, status):
-    metaFolder = 'territory2Models'
-    modelFolder, apiname = splitFolderApiname( f'{source_folder}/{metaFolder}', filename )
-    if 'rules/' in apiname:
-        ruleFile        = apiname.split( 'rules/' )[ 1 ]
-        metaFolderRules = 'territory2Rule'
-        if 'D' == status:
-            builders.add_change(metaFolderRules, f'{modelFolder}.{ruleFile}', ChangeType.DELETION)
-        else:
-            copy_parents(filename, delta_folder, 1)
-            builders.add_change(metaFolderRules, f'{modelFolder}.{ruleFile}', ChangeType.MODIFICATION)
-    elif 'territories/' in apiname:
-        territoryFile           = apiname.split( 'territories/' )[ 1 ]
-        metaFolderTerritories   = 'territory2'
-        if 'D' == status:
-            builders.add_change(metaFolderTerritories, f'{modelFolder}.{territoryFile}', ChangeType.DELETION)
-        else:
-            copy_parents(filename, delta_folder, 1)
-            builders.add_change(metaFolderTerritories, f'{modelFolder}.{territoryFile}', ChangeType.MODIFICATION)
+        dest = f'{context.delta_folder}/{folder}/{apiname}'
+        context.copy_plan.copy_tree(bundle_folder_path, dest)
+    else:  # erased bundle
+        context.builders.add_change(folder, apiname, ChangeType.DELETION)
+
+
+def __handle_nested_model_folder(context, difference):
+    ''' Handles the changes inside a model folder, each of the subfolders
+        declared for the model is a metadata type on its own '''
+    metaFolder = difference.folder
+    modelFolder, _, apiname = difference.apiname.partition('/')
+    changeFolder, changeName = metaFolder, apiname
+    for subFolder, subMetaFolder in NESTED_MODEL_FOLDERS[metaFolder].items():
+        if f'{subFolder}/' in apiname:
+            changeFolder = subMetaFolder
+            changeName = f'{modelFolder}.{apiname.split(f"{subFolder}/")[1]}'
+            break
+    if 'D' == difference.status:
+        context.builders.add_change(changeFolder, changeName, ChangeType.DELETION)
     else:
-        if 'D' == status:
-            builders.add_change(metaFolder, apiname, ChangeType.DELETION)
-        else:
-            copy_parents(filename, delta_folder, 1)
-            builders.add_change(metaFolder, apiname, ChangeType.MODIFICATION)
+        context.copy_plan.copy_parents(difference.filename,
+                                       context.delta_folder, 1)
+        context.builders.add_change(changeFolder, changeName, ChangeType.MODIFICATION)
 
 # *-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*
 
@@ -256,61 +475,52 @@ def splitFolderApiname( source_folder, filename ):
         filenameSplit = [ filenameSplit[ 0 ], "/".join( filenameSplit[ 1: ] ) ]
     return filenameSplit
 
-def get_folder_apiname(source_folder, filename):
-    ''' Extracts the apiname and the source folder of passed file '''
-    filename = filename[len(source_folder) + 1:]
-
-    filename = (filename[:filename.rfind('/')] if filename.count('/') > 1
-                else filename)
-
-    return filename.split('/')
-
-
 def __extract_differences(delta_folder, filename, xml_name, builders,
-                          source_ref, target_ref):
-    ''' Extracts the differences between a file and its previous version '''
-    new = parse_file(filename, xml_name, source_ref)
-    old = parse_file(filename, xml_name, target_ref)
+                          source_ref, target_ref, blob_reader=None,
+                          plan=False):
+    ''' Extracts the differences between a file and its previous version,
+        if plan is enabled only the size of the differences file is added '''
+    new, old = parse_changed(filename, xml_name, source_ref, target_ref,
+                             blob_reader)
 
     differences = old.compare(new, builders)
 
     if differences:
-        differences.to_file(delta_folder)
+        if plan:
+            builders.add_planned_files(
+                1, len(differences.to_string().encode('utf-8')))
+        else:
+            differences.to_file(delta_folder)
         differences.to_builders(builders)
 
 
-def get_xml_dict(treedict):
-    ''' Build a dict with xml as a value '''
-    snippet_dict = {}
-    for name, value in treedict.items():
-        for _, data_dict in value.items():
-            if isinstance(data_dict, dict):
-                iterate_dicts(data_dict, snippet_dict, name)
-    return snippet_dict
-
-# *-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*-*
+def __is_breakdown(difference):
+    ''' Returns true if a modification of the file is broken down '''
+    return bool(difference.definition
+                and difference.definition.xml_name in IMPLEMENTED_CHILD)
 
 
-def iterate_dicts(data_dict, dct, name):
-    '''Auxiliar method to iterate over nested dicts '''
-    for data_dict_name, data_dict_values in data_dict.items():
-        for _, attr_dicts in data_dict_values.items():
-            for _, attrs_value in attr_dicts.items():
-                for sets_value in attrs_value:
-                    name_id = get_unique_name(name,
-                                              data_dict_name,
-                                              sets_value)
-                    add_to_dict(dct, name_id, sets_value)
+__WORKER_BLOB_READER = None
 
 
-def add_to_dict(dictionary, key, value):
-    '''Method to add records on a specific dict '''
-    dictionary[key] = pprint_xml(value.get_xml(), False)
+def __init_breakdown_worker(log_level):
+    ''' Opens the blob reader of a breakdown worker process, with the log
+        level of the parent process '''
+    global __WORKER_BLOB_READER  # pylint: disable=W0603
+    __WORKER_BLOB_READER = BlobReader()
+    logger.configure(log_level)
 
 
-def get_unique_name(mdt_type, mtd_name, mdt_value):
-    ''' Create unique name for keys in dicts '''
-    return f"{mdt_type}.{mtd_name}.{mdt_value._apiname}"
+def __breakdown_worker(delta_folder, filename, xml_definition, source_ref,
+                       target_ref, plan=False):
+    ''' Runs the breakdown of a file in a worker process, returns the
+        recorded builder calls and the captured log records '''
+    recorder = BuildersRecorder()
+    with logger.capture() as records:
+        __extract_differences(delta_folder, filename, xml_definition,
+                              recorder, source_ref, target_ref,
+                              __WORKER_BLOB_READER, plan)
+    return recorder, records
 
 
 class Builders:
@@ -319,6 +529,8 @@ class Builders:
         self.tree = {}
         self.errors = set()
         self.xml_names = xml_names
+        self.planned_files = 0
+        self.planned_bytes = 0
         self.constructive = PackageBuilder(delta_folder, api_version,
                                            xml_names)
         self.destructive = DestructiveChangesBuilder(delta_folder,
@@ -353,24 +565,61 @@ class Builders:
         ''' Adds changes to the destructive builder '''
         self.destructive.add_changes(apinames)
 
-    def build_xmls(self):
-        ''' Builds XML for the builders '''
+    def build_xmls(self, max_components=MAX_COMPONENTS,
+                   report_folder=ARTIFACTS_FOLDER):
+        ''' Builds XML for the builders, if the delta exceeds the limits
+            of a deploy it is also split into units of max_components '''
         self.constructive.build_xml()
         if self.destructive.has_changes():
             self.destructive.build_xml()
 
+        delta_folder = self.constructive.delta_folder
+        clean_deploy_units(delta_folder)
+        if not max_components:
+            return
+        units = split_deploy_units(delta_folder,
+                                   self.constructive.get_tokens(),
+                                   self.destructive.get_tokens(),
+                                   self.xml_names, max_components)
+        if len(units) > 1:
+            write_deploy_units(units, delta_folder, self.constructive,
+                               self.destructive, report_folder)
+
+    def add_planned_files(self, files, size):
+        ''' Adds files the delta would write and their size in bytes '''
+        self.planned_files += files
+        self.planned_bytes += size
+
+    def build_plan(self, len_differences, report_folder=ARTIFACTS_FOLDER):
+        ''' Writes and prints the summary of the planned delta '''
+        components = self.constructive.get_member_counts()
+        destructive_components = self.destructive.get_member_counts()
+        plan = {'differences': len_differences,
+                'components': components,
+                'destructive_components': destructive_components,
+                'package_members': sum(components.values()),
+                'destructive_changes': sum(destructive_components.values()),
+                'files': self.planned_files,
+                'bytes': self.planned_bytes,
+                'errors': sorted(self.get_errors())}
+        plan_string = json.dumps(plan, indent=4, sort_keys=True)
+        write_file(report_folder, 'mergerPlan.json', plan_string,
+                   print_log=True)
+        logger.result(plan_string)
+
     def get_tree(self):
         ''' Gets tree builder'''
         return self.tree
 
-    def build_tree(self, print_tree, report_folder='artifacts_folder'):
-        ''' Builds the tree string '''
-        ansi_escape = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
-        escaped_tree = ansi_escape.sub('', get_tree_string(self.tree))
-        write_file(report_folder, 'mergerReport.txt', escaped_tree,
-                   print_log=True)
-        if print_tree:
-            print(get_tree_string(self.tree))
+    def build_tree(self, print_tree, report_folder=ARTIFACTS_FOLDER):
+        ''' Writes the tree view of the changes into the text report, and
+            prints it if print_tree is enabled, in a single walk '''
+        with open_file(report_folder, 'mergerReport.txt',
+                       print_log=True) as report_file:
+            sinks = [TextSink(report_file)]
+            if print_tree:
+                sinks.append(ConsoleSink())
+            write_tree(self.tree, sinks)
 
     def add_error(self, error_message):
         ''' Adds an error to the error list '''
@@ -394,26 +643,78 @@ class Builders:
             self.tree[package_name][change_type.value] = set()
         self.tree[package_name][change_type.value].add(apiname)
 
-    def build_html(self, differences, report_folder='artifacts_folder'):
-        ''' Builds html manifest for the generated delta package '''
-        snippet_dict = get_xml_dict(self.tree)
-        template_path = f"{PWD}/resources/templates/"
-        if not check_exist(template_path):
-            raise InvalidPath(template_path)
+    def build_html(self, differences, lazy_report=False,
+                   report_folder=ARTIFACTS_FOLDER):
+        ''' Builds html manifest for the generated delta package, if
+            lazy_report is enabled the snippets are written in chunks next to
+            it and loaded when a panel is expanded '''
+        # jinja2 is only loaded by the runs that render a report
+        # pylint: disable=C0415
+        from jinja2.exceptions import TemplateNotFound
+        from modules.utils.html_report import (SNIPPETS_FOLDER,
+                                               TEMPLATES_FOLDER, get_snippets,
+                                               render_report,
+                                               write_snippet_chunks)
+        if not check_exist(TEMPLATES_FOLDER):
+            raise InvalidPath(TEMPLATES_FOLDER)
+        if lazy_report:
+            snippet_dict = {}
+            snippet_chunks, package_chunks = write_snippet_chunks(
+                self.tree, report_folder)
+        else:
+            shutil.rmtree(f'{report_folder}/{SNIPPETS_FOLDER}',
+                          ignore_errors=True)
+            snippet_dict = get_snippets(self.tree)
+            snippet_chunks, package_chunks = {}, {}
         try:
-            loader = jinja2.FileSystemLoader(searchpath=(f'{PWD}/resources/'
-                                                         f'templates/'))
-            template_env = jinja2.Environment(loader=loader)
-            template = template_env.get_template(TEMPLATE_FILE)
-            report_file = template.render(treedict=self.tree.items(),
-                                          len_differences=len(differences),
-                                          len_treedict=len(self.tree),
-                                          snippet_dict=snippet_dict)
-            write_file(report_folder, 'mergerReport.html', report_file,
-                       print_log=True)
+            render_report(report_folder, 'mergerReport.html', TEMPLATE_FILE,
+                          treedict=self.tree.items(),
+                          len_differences=len(differences),
+                          len_treedict=len(self.tree),
+                          snippet_dict=snippet_dict,
+                          snippets_folder=SNIPPETS_FOLDER,
+                          snippet_chunks=snippet_chunks,
+                          package_chunks=package_chunks)
         except TemplateNotFound as exc:
-            print(f"{ERROR_TAG} Cannot found {exc} in {PWD}/resources/" +
-                  "templates/")
+            logger.error(f"{ERROR_TAG} Cannot found {exc} in "
+                         f"{TEMPLATES_FOLDER}/")
+
+
+class BuildersRecorder:
+    ''' Records the calls done to a Builders, so a breakdown run in a worker
+        process can be replayed over the real builders in order '''
+    def __init__(self):
+        self.calls = []
+
+    def add_change(self, *args, **kwargs):
+        ''' Records an add_change call '''
+        self.calls.append(('add_change', args, kwargs))
+
+    def add_constructive_changes(self, apinames):
+        ''' Records an add_constructive_changes call '''
+        self.calls.append(('add_constructive_changes', (apinames,), {}))
+
+    def add_child_differences(self, package_name, apiname, diffs):
+        ''' Records an add_child_differences call '''
+        self.calls.append(('add_child_differences',
+                           (package_name, apiname, diffs), {}))
+
+    def add_destructive_changes(self, apinames):
+        ''' Records an add_destructive_changes call '''
+        self.calls.append(('add_destructive_changes', (apinames,), {}))
+
+    def add_planned_files(self, files, size):
+        ''' Records an add_planned_files call '''
+        self.calls.append(('add_planned_files', (files, size), {}))
+
+    def add_error(self, error_message):
+        ''' Records an add_error call '''
+        self.calls.append(('add_error', (error_message,), {}))
+
+    def replay(self, builders):
+        ''' Replays the recorded calls over the passed builders '''
+        for method, args, kwargs in self.calls:
+            getattr(builders, method)(*args, **kwargs)
 
 
 class PackageBuilder:
@@ -438,8 +739,8 @@ class PackageBuilder:
         ''' Adds a destructive change into the list '''
         if folder not in self.xml_names:
             self.errors.add(folder)
-            print(f'{WARNING_TAG} Detected changes in non-controlled folder '
-                  f'\'{folder}\'')
+            logger.warning(f'{WARNING_TAG} Detected changes in non-controlled '
+                           f'folder \'{folder}\'')
         else:
             xml_name = self.xml_names[folder].xml_name
             if not apiname.endswith('-meta.xml'):
@@ -450,35 +751,50 @@ class PackageBuilder:
                 else:
                     self.__tokens[xml_name].add(apiname)
 
-    def build_xml(self):
-        ''' Generates the xml from the changes detected '''
-        file_path = f'{self.delta_folder}/{self.PACKAGE_NAME}'
-        remove_file(file_path)
-        types_string = ''
-        for xml_name, apinames in sorted(self.__tokens.items()):
-            types_string += self._generate_type_string(xml_name, apinames)
-        package = ('<?xml version="1.0" encoding="UTF-8"?>\n'
-                   '<Package xmlns="http://soap.sforce.com'
-                   '/2006/04/metadata">\n')
-        package += types_string
-        package += (f'\t<version>{self.api_version}</version>\n'
-                    '</Package>\n')
-        write_file(self.delta_folder, self.PACKAGE_NAME, package,
-                   print_log=True)
+    def build_xml(self, folder=None, tokens=None):
+        ''' Streams the xml of the changes detected, or of the passed
+            subset of them, into the delta folder or the passed folder '''
+        folder = folder or self.delta_folder
+        tokens = self.__tokens if tokens is None else tokens
+        with open_file(folder, self.PACKAGE_NAME, print_log=True,
+                       binary=True) as package_file:
+            package_file.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+            with etree.xmlfile(package_file, encoding='utf-8') as xml_file:
+                with xml_file.element('Package', xmlns=METADATA_NAMESPACE):
+                    for xml_name, members in sorted(tokens.items()):
+                        self._write_type(xml_file, xml_name, members)
+                    xml_file.write('\n\t')
+                    with xml_file.element('version'):
+                        xml_file.write(str(self.api_version))
+                    xml_file.write('\n')
+            package_file.write(b'\n')
+
+    def get_tokens(self):
+        ''' Returns the members of each type '''
+        return self.__tokens
 
     def has_changes(self):
         ''' Return true if there are changes '''
         return bool(self.__tokens)
 
+    def get_member_counts(self):
+        ''' Returns the number of members of each type '''
+        return {xml_name: len(apinames)
+                for xml_name, apinames in sorted(self.__tokens.items())}
+
     @staticmethod
-    def _generate_type_string(xml_name, members):
-        ''' Generates a type string with a wildcard as the members '''
-        members_string = ''.join([f'\t\t<members>{member}</members>\n'
-                                  for member in sorted(members)])
-        return (f'\t<types>\n'
-                f'{members_string}'
-                f'\t\t<name>{xml_name}</name>\n'
-                f'\t</types>\n')
+    def _write_type(xml_file, xml_name, members):
+        ''' Writes a types element with the sorted members '''
+        xml_file.write('\n\t')
+        with xml_file.element('types'):
+            for member in sorted(members):
+                xml_file.write('\n\t\t')
+                with xml_file.element('members'):
+                    xml_file.write(str(member))
+            xml_file.write('\n\t\t')
+            with xml_file.element('name'):
+                xml_file.write(xml_name)
+            xml_file.write('\n\t')
 
     def __repr__(self):
         return f'<{self.__class__.__name__}, {self.__tokens}>'
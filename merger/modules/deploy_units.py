@@ -0,0 +1,210 @@
+''' Deploy Units, splits a delta into several self-consistent packages that
+    fit in the limits of a Metadata API deploy. The units must be deployed
+    one after another in their order, the components referenced by others
+    are packed in the earlier units and the deletions in the last ones '''
+import json
+import os
+import shutil
+
+from modules.utils import (ARTIFACTS_FOLDER, INFO_TAG, WARNING_TAG, logger,
+                           write_file)
+from modules.utils.copiers import HardlinkCopier
+
+# components of a single deploy, constructive and destructive
+MAX_COMPONENTS = 10000
+# uncompressed size of the files of a single deploy
+MAX_UNIT_BYTES = 400 * 1024 * 1024
+UNITS_FOLDER_SUFFIX = '_units'
+UNIT_FOLDER_PREFIX = 'package_'
+# folders of the types deployed before the ones referencing them, the folders
+# not listed are deployed along the types of the third tier. Deletions go in
+# reverse order, the referencing types first
+DEPLOY_TIERS = (
+    ('globalValueSets', 'standardValueSets', 'labels', 'customPermissions',
+     'staticresources', 'objects'),
+    ('classes', 'triggers', 'pages', 'components', 'aura', 'lwc', 'email',
+     'documents', 'reportTypes', 'tabs'),
+    ('layouts', 'flexipages', 'quickActions', 'objectTranslations',
+     'workflows', 'flows', 'reports', 'dashboards', 'applications',
+     'customMetadata'),
+    ('permissionsets', 'permissionsetgroups', 'profiles'),
+)
+DEFAULT_TIER = 2
+FOLDER_TIERS = {folder: tier for tier, folders in enumerate(DEPLOY_TIERS)
+                for folder in folders}
+DEPLOY_ORDER = ('Units deployed one after another in their order, the '
+                'referenced types before the types referencing them and the '
+                'deletions in the last units, the referencing types first')
+
+
+class DeployGroup:
+    ''' Components that share files, always deployed in the same unit '''
+
+    def __init__(self):
+        self.members = {}
+        self.destructive = {}
+        self.files = []
+        self.size = 0
+
+    def add_members(self, xml_name, members, destructive=False):
+        ''' Adds members of a type to the constructive or destructive
+            components of the group '''
+        tokens = self.destructive if destructive else self.members
+        tokens.setdefault(xml_name, set()).update(members)
+
+    def add_group(self, group):
+        ''' Adds the components and the files of another group '''
+        for xml_name, members in group.members.items():
+            self.add_members(xml_name, members)
+        for xml_name, members in group.destructive.items():
+            self.add_members(xml_name, members, destructive=True)
+        self.files.extend(group.files)
+        self.size += group.size
+
+    def __len__(self):
+        return (sum(len(members) for members in self.members.values())
+                + sum(len(members) for members in self.destructive.values()))
+
+
+def get_units_folder(delta_folder):
+    ''' Returns the folder of the units of a delta folder '''
+    return f'{delta_folder.rstrip("/")}{UNITS_FOLDER_SUFFIX}'
+
+
+def split_deploy_units(delta_folder, constructive_tokens, destructive_tokens,
+                       xml_names, max_components=MAX_COMPONENTS,
+                       max_bytes=MAX_UNIT_BYTES):
+    ''' Groups the files of the delta folder with the components they hold
+        and packs the groups into units within the limits, ordered by the
+        tier of their folder so a unit only references components of the
+        same or earlier units. The deletions are packed in the last units,
+        once nothing deployed still references them, in reverse order. A
+        group above the limits can not be split and gets a unit of its own '''
+    groups = __get_file_groups(delta_folder)
+    for xml_name, members in constructive_tokens.items():
+        for member in members:
+            group = __get_member_group(groups, xml_names, xml_name,
+                                       str(member))
+            group.add_members(xml_name, {member})
+    deletions = {}
+    for xml_name, members in destructive_tokens.items():
+        folder = __get_folder(xml_names, xml_name)
+        for member in members:
+            group = deletions.setdefault((folder, str(member)), DeployGroup())
+            group.add_members(xml_name, {member}, destructive=True)
+
+    return (__pack_groups(sorted(groups.items(), key=__get_deploy_order),
+                          max_components, max_bytes)
+            + __pack_groups(sorted(deletions.items(), key=__get_deploy_order,
+                                   reverse=True),
+                            max_components, max_bytes))
+
+
+def write_deploy_units(units, delta_folder, constructive, destructive,
+                       report_folder=ARTIFACTS_FOLDER):
+    ''' Writes each unit in a folder with its files and manifests, and a
+        summary of the units in the report folder with the order in which
+        they must be deployed '''
+    units_folder = get_units_folder(delta_folder)
+    logger.info(f'\n{INFO_TAG} Splitting the delta in {len(units)} deploy '
+                f'units in \'{units_folder}\', to be deployed one '
+                'after another in their order')
+    copier = HardlinkCopier()
+    summary = []
+    for index, unit in enumerate(units, start=1):
+        unit_folder = f'{units_folder}/{UNIT_FOLDER_PREFIX}{index}'
+        for filepath in unit.files:
+            os.makedirs(os.path.dirname(f'{unit_folder}/{filepath}'),
+                        exist_ok=True)
+            copier.copy(f'{delta_folder}/{filepath}',
+                        f'{unit_folder}/{filepath}')
+        constructive.build_xml(unit_folder, unit.members)
+        if unit.destructive:
+            destructive.build_xml(unit_folder, unit.destructive)
+        summary.append({'order': index,
+                        'folder': unit_folder,
+                        'components': len(unit),
+                        'destructive': sum(len(members) for members
+                                           in unit.destructive.values()),
+                        'files': len(unit.files),
+                        'bytes': unit.size})
+    write_file(report_folder, 'mergerUnits.json',
+               json.dumps({'deploy_order': DEPLOY_ORDER, 'units': summary},
+                          indent=4), print_log=True)
+
+
+def clean_deploy_units(delta_folder):
+    ''' Removes the units of a previous run '''
+    shutil.rmtree(get_units_folder(delta_folder), ignore_errors=True)
+
+
+def __pack_groups(groups, max_components, max_bytes):
+    ''' Packs the sorted groups into units within the limits, in order '''
+    units = []
+    unit = DeployGroup()
+    for _, group in groups:
+        if not len(group):
+            continue
+        if len(unit) and (len(unit) + len(group) > max_components
+                          or unit.size + group.size > max_bytes):
+            units.append(unit)
+            unit = DeployGroup()
+        if len(group) > max_components or group.size > max_bytes:
+            logger.warning(f'{WARNING_TAG} {len(group)} components sharing '
+                           f'{len(group.files)} files exceed the limits of '
+                           'a deploy unit')
+        unit.add_group(group)
+    if len(unit):
+        units.append(unit)
+    return units
+
+
+def __get_file_groups(delta_folder):
+    ''' Returns the files of the delta folder grouped by the component that
+        holds them: the folder and the first name below it without
+        extension, so bundles, folders and meta files stay together '''
+    groups = {}
+    for root, _, filenames in os.walk(delta_folder):
+        for filename in filenames:
+            filepath = os.path.relpath(f'{root}/{filename}', delta_folder)
+            parts = filepath.split(os.sep)
+            if len(parts) < 2:
+                continue  # manifests
+            name = parts[1]
+            if len(parts) == 2:
+                name = __strip_extension(name)
+            group = groups.setdefault((parts[0], name), DeployGroup())
+            group.files.append('/'.join(parts))
+            group.size += os.path.getsize(f'{root}/{filename}')
+    return groups
+
+
+def __get_member_group(groups, xml_names, xml_name, member):
+    ''' Returns the group holding the files of a member, child types are
+        held by the files of their parent type '''
+    folder = __get_folder(xml_names, xml_name)
+    for name in (member.split('/')[0], member.split('.')[0]):
+        if (folder, name) in groups:
+            return groups[(folder, name)]
+    return groups.setdefault((folder, member.split('/')[0]), DeployGroup())
+
+
+def __get_folder(xml_names, xml_name):
+    ''' Returns the folder of a type, child types are held in the folder of
+        their parent type '''
+    metadata_type = (xml_names.get_by_xml_name(xml_name)
+                     or xml_names.get_parent(xml_name))
+    return metadata_type.dir_name if metadata_type else xml_name
+
+
+def __get_deploy_order(item):
+    ''' Sorting key of a group, the tier of its folder and then its key '''
+    (folder, name), _ = item
+    return FOLDER_TIERS.get(folder, DEFAULT_TIER), folder, name
+
+
+def __strip_extension(filename):
+    ''' Returns the filename without meta suffix nor extension '''
+    if filename.endswith('-meta.xml'):
+        filename = filename[:-len('-meta.xml')]
+    return filename[:filename.rfind('.')] if '.' in filename else filename
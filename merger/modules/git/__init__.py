@@ -1,34 +1,60 @@
 ''' Prepare branches module '''
-from modules.utils import INFO_TAG, WARNING_LINE, call_subprocess
+from collections import namedtuple
+
+from modules.utils import INFO_TAG, WARNING_LINE, call_subprocess, logger
 from modules.utils.exceptions import (BranchesUpToDateException,
                                       BranchNotFoundException,
                                       CouldNotFetchException,
+                                      CouldNotMergeTree,
                                       MergeConflictsException,
                                       MergeException,
                                       CouldNotCreateBranch,
                                       CouldNotCherryPick)
 from modules.git.utils import get_branch_list, get_remote_url, parse_conflicts
 
+# result of a merge in memory, the merged tree and the commits merged
+MergeTree = namedtuple('MergeTree', ['tree', 'source', 'target'])
+
 
-def prepare_and_merge(source, target, remote, fetch_, reset):
-    ''' Prepares source and target branches '''
+def prepare_and_merge(source, target, remote, fetch_, reset, detach=False):
+    ''' Prepares source and target branches, if detach is enabled the
+        commit of the target is checked out and the commit of the source
+        merged into it, so no branch is checked out nor moved '''
     if fetch_:
         fetch(remote)
 
     validate_branches(source, target, remote)
 
+    if detach:
+        checkout(resolve_branch(target, remote, reset), remote, detach=True)
+        merge(source, target, resolve_branch(source, remote, reset))
+        return
+
     checkout(source, remote, reset=reset)
     checkout(target, remote, reset=reset)
 
     merge(source, target)
 
 
+def prepare_and_merge_tree(source, target, remote, fetch_, reset):
+    ''' Prepares source and target refs and merges them in memory, nothing
+        is checked out. If reset is enabled the remote branches are merged
+        instead of the local ones. Returns the MergeTree of the merge '''
+    if fetch_:
+        fetch(remote)
+
+    validate_branches(source, target, remote)
+
+    return merge_tree(source, target, resolve_branch(source, remote, reset),
+                      resolve_branch(target, remote, reset))
+
+
 def fetch(remote, remote_url=None, count=0, verbose=True):
     ''' Fetchs from the remote '''
     remote_url = get_remote_url(remote, verbose=verbose)
     if not remote_url:
-        print(f'{WARNING_LINE} Remote not found, omiting fetch')
-    print(f'{INFO_TAG} Fetching from {remote} ({remote_url}) ...')
+        logger.warning(f'{WARNING_LINE} Remote not found, omiting fetch')
+    logger.info(f'{INFO_TAG} Fetching from {remote} ({remote_url}) ...')
     _, errcode = call_subprocess(f'git fetch {remote}', verbose=verbose)
     if errcode > 0 and count > 3:
         raise CouldNotFetchException(remote)
@@ -36,30 +62,36 @@ def fetch(remote, remote_url=None, count=0, verbose=True):
         fetch(remote, remote_url=remote_url, count=count + 1, verbose=verbose)
 
 
-def checkout(branch_name, remote, reset=False):
+def checkout(branch_name, remote, reset=False, detach=False):
     ''' Checkots to passed branch, if reset flag is activated, resets
-        to the branch in the remote '''
-    print(f'{INFO_TAG} Checking out \'{branch_name}\'')
+        to the branch in the remote. If detach is enabled the commit of the
+        branch is checked out, a branch can only be checked out by a single
+        worktree '''
+    logger.info(f'{INFO_TAG} Checking out \'{branch_name}\'')
     get_actual_branch_command = 'git rev-parse --abbrev-ref HEAD | tr -d "\n"'
     actual_branch, _ = call_subprocess(get_actual_branch_command,
                                        verbose=False)
 
-    if actual_branch != branch_name:
-        print(f'\t- Checking out {branch_name}')
+    if detach:
+        logger.info(f'\t- Checking out {branch_name} detached')
+        call_subprocess(f'git checkout -f --detach {branch_name}',
+                        verbose=True)
+    elif actual_branch != branch_name:
+        logger.info(f'\t- Checking out {branch_name}')
         call_subprocess(f'git checkout -f {branch_name}', verbose=True)
     else:
-        print(f'\t- Currently on target branch')
+        logger.info(f'\t- Currently on target branch')
     if reset:
-        print(f'\t- Reseting local branch \'{branch_name}\' to remote branch '
-              f'\'{remote}/{branch_name}\'')
+        logger.info(f'\t- Reseting local branch \'{branch_name}\' to remote '
+                    f'branch \'{remote}/{branch_name}\'')
         call_subprocess(f'git reset --hard {remote}/{branch_name}',
                         verbose=False)
-    print()
+    logger.info()
 
 
 def create_branch(branch_name, do_checkout=True):
     ''' Creates a branch, can select to checkout on it or not '''
-    print(f'{INFO_TAG} Creating branch \'{branch_name}\'')
+    logger.info(f'{INFO_TAG} Creating branch \'{branch_name}\'')
     create_command = (f'git checkout -b {branch_name}' if do_checkout
                       else f'git branch {branch_name}')
     output, status_code = call_subprocess(create_command, verbose=False)
@@ -69,7 +101,7 @@ def create_branch(branch_name, do_checkout=True):
 
 def cherry_pick(commit_sha):
     ''' Cherry picks into current branch '''
-    print(f'{INFO_TAG} Cherry picking \'{commit_sha}\'')
+    logger.info(f'{INFO_TAG} Cherry picking \'{commit_sha}\'')
     create_command = (f'git cherry-pick {commit_sha} -m 1')  # TODO check this
     output, status_code = call_subprocess(create_command, verbose=False)
     if status_code:
@@ -80,8 +112,8 @@ def validate_branches(source_branch, target_branch, remote):
     ''' Validate branches checking if exits in the current repo '''
     branches = get_branch_list(all_branches=True)
 
-    print(f'{INFO_TAG} Validating branches source and target '
-          f'branches in remote ({remote})')
+    logger.info(f'{INFO_TAG} Validating branches source and target '
+                f'branches in remote ({remote})')
 
     remote_source_branch = f'remotes/{remote}/{source_branch}'
     if not (source_branch in branches or remote_source_branch in branches):
@@ -92,10 +124,11 @@ def validate_branches(source_branch, target_branch, remote):
         raise BranchNotFoundException(target_branch)
 
 
-def merge(source_branch, target_branch):
-    ''' Merge branches '''
-    print(f'{INFO_TAG} Merging {source_branch} into {target_branch}')
-    command = (f'git merge --no-ff {source_branch} '
+def merge(source_branch, target_branch, source_ref=None):
+    ''' Merge branches, the source_ref is merged instead of the source
+        branch if passed '''
+    logger.info(f'{INFO_TAG} Merging {source_branch} into {target_branch}')
+    command = (f'git merge --no-ff {source_ref or source_branch} '
                f'-m "Merge branch {source_branch} into {target_branch}"')
     stdout, errcode = call_subprocess(command)
     if 'Already up to date.' in stdout:
@@ -105,3 +138,68 @@ def merge(source_branch, target_branch):
             raise MergeConflictsException(source_branch, target_branch,
                                           parse_conflicts(stdout))
         raise MergeException()
+
+
+def resolve_branch(branch_name, remote, remote_first=False):
+    ''' Returns the commit of the local branch, or of the remote branch if
+        there is no local branch or remote_first is enabled '''
+    references = [branch_name, f'{remote}/{branch_name}']
+    if remote_first:
+        references.reverse()
+    for reference in references:
+        sha, errcode = call_subprocess(f'git rev-parse --verify -q '
+                                       f'{reference}^{{commit}}',
+                                       verbose=False)
+        if errcode == 0:
+            return sha.strip()
+    raise BranchNotFoundException(branch_name)
+
+
+def merge_tree(source_branch, target_branch, source_sha, target_sha):
+    ''' Merges the source commit into the target commit with git merge-tree,
+        the index and the working tree are not touched. Returns the
+        MergeTree of the merge '''
+    logger.info(f'{INFO_TAG} Merging {source_branch} into {target_branch} '
+                f'in memory')
+    _, errcode = call_subprocess(f'git merge-base --is-ancestor '
+                                 f'{source_sha} {target_sha}', verbose=False)
+    if errcode == 0:
+        raise BranchesUpToDateException(source_branch, target_branch)
+    command = (f'git merge-tree --write-tree --name-only --no-messages '
+               f'{target_sha} {source_sha}')
+    stdout, errcode = call_subprocess(command, verbose=False)
+    # the merged tree, followed by the conflicted files if any
+    lines = [line for line in stdout.splitlines() if line]
+    if errcode == 1:
+        raise MergeConflictsException(source_branch, target_branch,
+                                      len(set(lines[1:])))
+    if errcode != 0 or not lines:
+        raise CouldNotMergeTree(source_branch, target_branch, stdout)
+    return MergeTree(lines[0], source_sha, target_sha)
+
+
+def commit_merge_tree(merged, source_branch, target_branch):
+    ''' Creates the merge commit of a merge in memory and moves the target
+        branch to it, the working tree is only updated if the target branch
+        is checked out. Returns the merge commit '''
+    logger.info(f'{INFO_TAG} Committing the merge of {source_branch} into '
+                f'{target_branch}')
+    command = (f'git commit-tree {merged.tree} -p {merged.target} '
+               f'-p {merged.source} '
+               f'-m "Merge branch {source_branch} into {target_branch}"')
+    commit, errcode = call_subprocess(command, verbose=False)
+    if errcode != 0:
+        raise MergeException()
+    commit = commit.strip()
+
+    actual_branch, _ = call_subprocess('git rev-parse --abbrev-ref HEAD',
+                                       verbose=False)
+    if actual_branch.strip() == target_branch:
+        command = f'git reset --keep {commit}'
+    else:
+        command = f'git update-ref refs/heads/{target_branch} {commit}'
+    _, errcode = call_subprocess(command)
+    if errcode != 0:
+        raise MergeException()
+    logger.info(f'\t- Merge commit {commit}')
+    return commit
@@ -0,0 +1,84 @@
+''' Blob reader module, serves files from the object database '''
+import subprocess
+import threading
+
+from modules.utils.exceptions import BlobNotFound
+
+
+class BlobReader:
+    ''' Keeps a single `git cat-file --batch` process open for the whole run,
+        so reading a file from any revision does not spawn a new process '''
+    COMMAND = ['git', 'cat-file', '--batch']
+
+    def __init__(self):
+        self.__process = None
+        self.__lock = threading.Lock()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def open(self):
+        ''' Starts the cat-file process if it is not running '''
+        if self.__process is None:
+            self.__process = subprocess.Popen(self.COMMAND,
+                                              stdin=subprocess.PIPE,
+                                              stdout=subprocess.PIPE)
+
+    def close(self):
+        ''' Stops the cat-file process '''
+        if self.__process is not None:
+            self.__process.stdin.close()
+            self.__process.stdout.close()
+            self.__process.wait()
+            self.__process = None
+
+    def read(self, filepath, revision):
+        ''' Returns the raw bytes of the file in the passed revision, can be
+            called from several threads '''
+        with self.__lock:
+            return self.__read(filepath, revision)
+
+    def __read(self, filepath, revision):
+        ''' Requests and reads a blob from the cat-file process '''
+        self.open()
+        self.__process.stdin.write(f'{revision}:{filepath}\n'.encode('utf-8'))
+        self.__process.stdin.flush()
+
+        header = self.__process.stdout.readline().decode('utf-8')
+        size = header.rstrip('\n').rsplit(' ', 1)[-1]
+        if not size.isdigit():  # '<object> missing' or '<object> ambiguous'
+            raise BlobNotFound(filepath, revision)
+
+        content = self.__process.stdout.read(int(size))
+        self.__process.stdout.read(1)  # trailing line feed
+        return content
+
+    @staticmethod
+    def get_sizes(filepaths, revision):
+        ''' Returns the size of each file in the revision with a single
+            `git cat-file --batch-check` call, missing files are skipped '''
+        filepaths = [filepath for filepath in filepaths
+                     if '\n' not in filepath]
+        command = ['git', 'cat-file', '--batch-check=%(objectsize)']
+        stdin = ''.join(f'{revision}:{filepath}\n' for filepath in filepaths)
+        process = subprocess.run(command, input=stdin.encode('utf-8'),
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.DEVNULL, check=False)
+        lines = process.stdout.decode('utf-8').splitlines()
+        return {filepath: int(size)
+                for filepath, size in zip(filepaths, lines) if size.isdigit()}
+
+    @staticmethod
+    def list_files(path, revision):
+        ''' Returns the files under the passed path in the revision, empty
+            if the path does not exist '''
+        command = ['git', 'ls-tree', '-r', '-z', '--name-only', revision,
+                   '--', f':(top,literal){path}']
+        process = subprocess.run(command, stdout=subprocess.PIPE,
+                                 stderr=subprocess.DEVNULL, check=False)
+        return [filepath for filepath
+                in process.stdout.decode('utf-8').split('\0') if filepath]
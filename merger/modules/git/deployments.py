@@ -0,0 +1,73 @@
+''' Deployments module, keeps the last deployed commit per environment '''
+import subprocess
+
+from modules.utils import INFO_TAG, WARNING_TAG, call_subprocess, logger
+from modules.utils.exceptions import (CouldNotRecordDeployment,
+                                      InvalidEnvironment)
+
+DEPLOYMENTS_REF = 'refs/merger/deployments'
+
+
+def get_deployment_ref(environment):
+    ''' Returns the ref that keeps the watermark of the environment '''
+    deployment_ref = f'{DEPLOYMENTS_REF}/{environment}'
+    # the same rules git update-ref applies, checked before any build runs
+    process = subprocess.run(['git', 'check-ref-format', deployment_ref],
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, check=False)
+    if process.returncode:
+        raise InvalidEnvironment(environment)
+    return deployment_ref
+
+
+def get_watermark(environment):
+    ''' Returns the last deployed commit of the environment, None if nothing
+        has been recorded yet '''
+    command = (f'git rev-parse --verify -q '
+               f'{get_deployment_ref(environment)}^{{commit}}')
+    output, returncode = call_subprocess(command, verbose=False)
+    return output.strip() if returncode == 0 else None
+
+
+def resolve_watermark(environment, source_ref):
+    ''' Returns the reference the delta of the environment starts from,
+        the previous commit of the source if there is no watermark '''
+    watermark = get_watermark(environment)
+    if watermark:
+        logger.info(f'{INFO_TAG} Last deployment to \'{environment}\' was '
+                    f'\'{watermark}\'')
+        return watermark
+    logger.warning(f'{WARNING_TAG} No deployment recorded for '
+                   f'\'{environment}\', using \'{source_ref}~1\'')
+    return f'{source_ref}~1'
+
+
+def record_deployment(environment, revision, remote=None, push=False):
+    ''' Records the revision as the last deployed commit of the environment,
+        pushing the watermark to the remote if push is enabled '''
+    deployment_ref = get_deployment_ref(environment)
+    sha, returncode = call_subprocess(f'git rev-parse --verify -q '
+                                      f'{revision}^{{commit}}', verbose=False)
+    if returncode:
+        raise CouldNotRecordDeployment(environment, revision, sha)
+    sha = sha.strip()
+
+    logger.info(f'{INFO_TAG} Recording \'{sha}\' as deployed to '
+                f'\'{environment}\'')
+    output, returncode = call_subprocess(f'git update-ref {deployment_ref} '
+                                         f'{sha}', verbose=False)
+    if returncode:
+        raise CouldNotRecordDeployment(environment, revision, output)
+
+    if push:
+        output, returncode = call_subprocess(f'git push -f {remote} '
+                                             f'{deployment_ref}',
+                                             verbose=False)
+        if returncode:
+            raise CouldNotRecordDeployment(environment, revision, output)
+
+
+def fetch_watermarks(remote):
+    ''' Fetches the watermarks of every environment from the remote '''
+    call_subprocess(f'git fetch {remote} '
+                    f'+{DEPLOYMENTS_REF}/*:{DEPLOYMENTS_REF}/*', verbose=False)
@@ -4,7 +4,7 @@ from enum import Enum
 from colorama import Fore
 
 from modules.git.utils import get_short_sha, get_tag_commit
-from modules.utils import (INFO_TAG, WARNING_TAG, call_subprocess,
+from modules.utils import (INFO_TAG, WARNING_TAG, call_subprocess, logger,
                            truncate_string)
 from modules.utils.exceptions import InvalidCommitLine, NotAcceptedOutputType
 from modules.utils.models import OutputType
@@ -33,8 +33,8 @@ class Tag:
         if force or self.sha_commit:
             self.sha_commit = get_tag_commit(self.tag_name)
         elif self.sha_commit.startswith('HEAD'):
-            print(f'{WARNING_TAG} Tag not created still '
-                  f'referencing {self.sha_commit}')
+            logger.warning(f'{WARNING_TAG} Tag not created still '
+                           f'referencing {self.sha_commit}')
         return (self.sha_commit if not short
                 else get_short_sha(self.sha_commit))
 
@@ -43,8 +43,8 @@ class Tag:
         command = f'git tag {self.tag_name} {self.sha_commit}'
         call_subprocess(command, verbose=False)
         self.sha_commit = self.get_sha_commit(force=True)
-        print(f'{INFO_TAG} Tag {self.tag_name} created '
-              f'in commit {self.sha_commit}')
+        logger.info(f'{INFO_TAG} Tag {self.tag_name} created '
+                    f'in commit {self.sha_commit}')
 
     @staticmethod
     def get_last_tag():
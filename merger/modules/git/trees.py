@@ -0,0 +1,82 @@
+''' Trees module, sources the delta files are copied from '''
+import os
+import threading
+
+from modules.utils import copy_file
+from modules.utils.copiers import FileCopier
+from modules.utils.exceptions import BlobNotFound
+
+
+class WorkingTree:
+    ''' Copies the files from the checked out working tree with the copy
+        strategy of the passed copier '''
+
+    def __init__(self, copier=None):
+        self.copier = copier or FileCopier()
+
+    @staticmethod
+    def is_dir(path):
+        ''' Returns true if the path is a folder '''
+        return os.path.isdir(path)
+
+    @staticmethod
+    def list_files(path):
+        ''' Returns the files under the passed folder '''
+        return sorted(f'{folder}/{filename}'
+                      for folder, _, filenames in os.walk(path)
+                      for filename in filenames)
+
+    @staticmethod
+    def get_sizes(filepaths):
+        ''' Returns the size of each file, missing files are skipped '''
+        return {filepath: os.path.getsize(filepath)
+                for filepath in filepaths if os.path.isfile(filepath)}
+
+    def copy_file(self, src, dest):
+        ''' Copies a file, missing files are ignored '''
+        copy_file(src, dest, True, self.copier)
+
+    def get_summary(self):
+        ''' Returns a message with the bytes copied and linked '''
+        return self.copier.get_summary()
+
+
+class RevisionTree:
+    ''' Writes the files straight from the object database of a revision,
+        the working tree is never read nor checked out '''
+
+    def __init__(self, revision, blob_reader):
+        self.revision = revision
+        self.blob_reader = blob_reader
+        self.bytes_written = 0
+        self.__lock = threading.Lock()
+
+    def is_dir(self, path):
+        ''' Returns true if the path is a folder in the revision '''
+        return bool(self.list_files(path))
+
+    def list_files(self, path):
+        ''' Returns the files under the passed folder in the revision '''
+        return self.blob_reader.list_files(path, self.revision)
+
+    def get_sizes(self, filepaths):
+        ''' Returns the size of each file in the revision, missing files
+            are skipped '''
+        return self.blob_reader.get_sizes(filepaths, self.revision)
+
+    def copy_file(self, src, dest):
+        ''' Writes the blob into dest, missing blobs are ignored the same
+            way copy_file ignores missing files '''
+        try:
+            content = self.blob_reader.read(src, self.revision)
+        except BlobNotFound:
+            return
+        with open(dest, 'wb') as dest_file:
+            dest_file.write(content)
+        with self.__lock:
+            self.bytes_written += len(content)
+
+    def get_summary(self):
+        ''' Returns a message with the bytes written '''
+        return (f'Written {self.bytes_written} bytes from the objects of '
+                f'\'{self.revision}\'')
@@ -1,8 +1,11 @@
 ''' Utils module of git package '''
 import re
+import subprocess
 
 from modules.utils import call_subprocess
-from modules.utils.exceptions import MalformedRemoteUrl
+from modules.utils.exceptions import CouldNotDiff, MalformedRemoteUrl
+
+DIFF_CHUNK_SIZE = 64 * 1024
 
 
 def get_short_sha(long_sha):
@@ -24,7 +27,9 @@ def get_branch_list(all_branches=False):
     all_parameter = '-a' if all_branches else ''
     branches, _ = call_subprocess(f'git branch --list {all_parameter}',
                                   verbose=False)
-    branches = [branch.replace('* ', '').strip()
+    # the current branch is marked with '*' and the branches checked out in
+    # other worktrees with '+'
+    branches = [branch[2:].strip()
                 for branch in branches.split('\n') if branch]
     return branches
 
@@ -68,6 +73,42 @@ def get_file(filepath, revision):
     return output.encode('utf-8')
 
 
+def iter_name_status(source, target, pathspec=None, rename_threshold=None,
+                     copy_threshold=None):
+    ''' Streams the name status diff between two references, yields a tuple
+        (status, paths) per record as soon as it is read from git, paths has
+        two values (origin, destination) for renames and copies '''
+    command = ['git', 'diff', '--name-status', '-z']
+    if rename_threshold is not None:
+        command.append(f'--find-renames={rename_threshold}%')
+    if copy_threshold is not None:
+        command.append(f'--find-copies={copy_threshold}%')
+    command += [target, source, '--']
+    if pathspec:
+        command.append(f':(top,literal){pathspec}')
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    fields = __iter_fields(process.stdout)
+    for status in fields:
+        path_count = 2 if status[0] in 'RC' else 1
+        yield status, tuple(next(fields) for _ in range(path_count))
+
+    _, stderr = process.communicate()
+    if process.returncode:
+        raise CouldNotDiff(target, source, stderr.decode('utf-8'))
+
+
+def __iter_fields(stream):
+    ''' Yields the NUL separated fields of the stream while reading it '''
+    pending = b''
+    for chunk in iter(lambda: stream.read1(DIFF_CHUNK_SIZE), b''):
+        fields = (pending + chunk).split(b'\0')
+        pending = fields.pop()
+        for field in fields:
+            yield field.decode('utf-8')
+
+
 def is_git_repository():
     validate_repo = 'git rev-parse --is-inside-work-tree'
     _, returncode = call_subprocess(validate_repo, False)
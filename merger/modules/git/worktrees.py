@@ -0,0 +1,112 @@
+''' Worktrees module, a pool of worktrees of the clone so several jobs can
+    build deltas at the same time sharing a single object store '''
+import os
+import time
+from contextlib import contextmanager
+
+from modules.utils import INFO_TAG, call_subprocess, logger
+from modules.utils.exceptions import (CouldNotCreateWorktree, NoFreeWorktree,
+                                      WorktreesNotSupported)
+
+try:
+    import fcntl
+except ImportError:  # not available on windows, leases can not be locked
+    fcntl = None
+
+# inside the common git folder, shared by every worktree of the clone
+POOL_FOLDER = 'merger-worktrees'
+POOL_LOCK = 'pool.lock'
+WORKTREE_PREFIX = 'worktree_'
+LOCK_EXTENSION = '.lock'
+LEASE_POLL_SECONDS = 1
+LEASE_TIMEOUT = 60 * 60
+
+
+class WorktreePool:
+    ''' Pool of worktrees of the clone, each worktree is leased to a single
+        job at a time through a lock on its lock file, released when the job
+        ends even if its process is killed. Worktrees are added the first
+        time they are leased and kept for the next jobs '''
+
+    def __init__(self, size, pool_folder=None):
+        if fcntl is None:
+            raise WorktreesNotSupported()
+        self.size = size
+        self.pool_folder = pool_folder or get_pool_folder()
+
+    @contextmanager
+    def lease(self, timeout=LEASE_TIMEOUT):
+        ''' Waits for a free worktree of the pool and runs the context in
+            it, the worktree is cleaned before the job so nothing is left
+            from the previous one. Yields the path of the worktree '''
+        os.makedirs(self.pool_folder, exist_ok=True)
+        worktree, lock_file = self.__acquire(timeout)
+        try:
+            self.__prepare(worktree)
+            logger.info(f'{INFO_TAG} Running in worktree \'{worktree}\'')
+            origin = os.getcwd()
+            os.chdir(worktree)
+            try:
+                yield worktree
+            finally:
+                os.chdir(origin)
+        finally:
+            lock_file.close()
+
+    def __acquire(self, timeout):
+        ''' Locks the first free worktree of the pool, polling until one is
+            freed. Returns the path of the worktree and its open lock file '''
+        deadline = time.monotonic() + timeout
+        waiting = False
+        while True:
+            for index in range(self.size):
+                worktree = f'{self.pool_folder}/{WORKTREE_PREFIX}{index}'
+                lock_file = open(f'{worktree}{LOCK_EXTENSION}', 'a')
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    lock_file.close()
+                    continue
+                return worktree, lock_file
+            if time.monotonic() > deadline:
+                raise NoFreeWorktree(self.size, timeout)
+            if not waiting:
+                logger.info(f'{INFO_TAG} Waiting for a free worktree of the '
+                            f'pool of {self.size}')
+                waiting = True
+            time.sleep(LEASE_POLL_SECONDS)
+
+    def __prepare(self, worktree):
+        ''' Adds the worktree if it does not exist yet, or discards the
+            changes and files left by the previous job '''
+        if os.path.exists(f'{worktree}/.git'):
+            call_subprocess(f'git -C "{worktree}" reset -q --hard',
+                            verbose=False)
+            call_subprocess(f'git -C "{worktree}" clean -q -fdx',
+                            verbose=False)
+            return
+        # adding and pruning worktrees write the shared git folder
+        with open(f'{self.pool_folder}/{POOL_LOCK}', 'a') as pool_lock:
+            fcntl.flock(pool_lock, fcntl.LOCK_EX)
+            logger.info(f'{INFO_TAG} Adding worktree \'{worktree}\' to the '
+                        f'pool')
+            call_subprocess('git worktree prune', verbose=False)
+            output, errcode = call_subprocess(f'git worktree add --detach '
+                                              f'"{worktree}" HEAD',
+                                              verbose=False)
+            if errcode:
+                raise CouldNotCreateWorktree(worktree, output)
+
+
+def get_pool_folder():
+    ''' Returns the folder of the pool in the common git folder of the
+        clone, the same from the clone and from any of its worktrees '''
+    common_dir, _ = call_subprocess('git rev-parse --git-common-dir',
+                                    verbose=False)
+    return os.path.join(os.path.abspath(common_dir.strip()), POOL_FOLDER)
+
+
+def get_job_folder(jobs_folder, job_name):
+    ''' Returns the absolute folder of a job, where its delta and artifacts
+        are written '''
+    return os.path.abspath(os.path.join(jobs_folder, job_name))
@@ -1,30 +1,46 @@
 ''' Module for testing parsing '''
 from modules.git.utils import get_file
-from modules.parser.models.assignment_rules import AssignmentRules
-from modules.parser.models.auto_response_rules import AutoResponseRules
-from modules.parser.models.custom_labels import CustomLabels
+from modules.parser.digests import (get_changed_keys, get_minimum_tags,
+                                    hash_children)
 from modules.parser.models.custom_object import Object
-from modules.parser.models.escalation_rules import EscalationRules
-from modules.parser.models.managed_topic import ManagedTopics
-from modules.parser.models.matching_rules import MatchingRules
-from modules.parser.models.permission_set import PermissionSet
-from modules.parser.models.profiles import Profile
-from modules.parser.models.sharing_rules import SharingRules
-from modules.parser.models.workflow import Workflow
+from modules.parser.schema import PARSED_TYPES
+from modules.utils import logger
 
-IMPLEMENTED_CHILD = {AutoResponseRules.PACKAGE_NAME: AutoResponseRules,
-                     CustomLabels.PACKAGE_NAME: CustomLabels,
-                     Object.PACKAGE_NAME: Object,
-                     EscalationRules.PACKAGE_NAME: EscalationRules,
-                     ManagedTopics.PACKAGE_NAME: ManagedTopics,
-                     MatchingRules.PACKAGE_NAME: MatchingRules,
-                     Profile.PACKAGE_NAME: Profile,
-                     SharingRules.PACKAGE_NAME: SharingRules,
-                     Workflow.PACKAGE_NAME: Workflow}
+# CustomObject is still defined as code, the rest of types by their schema
+IMPLEMENTED_CHILD = {Object.PACKAGE_NAME: Object, **PARSED_TYPES}
 
 
-def parse_file(filename, xml_definition, reference):
-    ''' Parse a file into a Object bassed on the definition '''
-    print( filename )
+def parse_file(filename, xml_definition, reference, blob_reader=None):
+    ''' Parse a file into a Object bassed on the definition, if a blob reader
+        is passed the file is read from it instead of spawning git show '''
+    logger.debug('Parsing %s', filename)
     object_class = IMPLEMENTED_CHILD[xml_definition.xml_name]
-    return object_class(filename, filestring=get_file(filename, reference))
+    return object_class(filename, filestring=__read_file(filename, reference,
+                                                         blob_reader))
+
+
+def parse_changed(filename, xml_definition, source_ref, target_ref,
+                  blob_reader=None):
+    ''' Parse both versions of a file into Objects bassed on the definition,
+        the top level elements are hashed first and only the changed ones
+        are built, along with the attributes and the minimum values.
+        Returns the new and the old objects '''
+    logger.debug('Parsing changes of %s', filename)
+    object_class = IMPLEMENTED_CHILD[xml_definition.xml_name]
+    new_string = __read_file(filename, source_ref, blob_reader)
+    old_string = __read_file(filename, target_ref, blob_reader)
+    selected = None
+    if new_string and old_string and not object_class.DEPLOYED_WHOLE:
+        selected = get_changed_keys(
+            hash_children(old_string, object_class.CHILD_DISPATCH),
+            hash_children(new_string, object_class.CHILD_DISPATCH))
+        selected.update(get_minimum_tags(object_class))
+    return (object_class(filename, filestring=new_string, _selected=selected),
+            object_class(filename, filestring=old_string, _selected=selected))
+
+
+def __read_file(filename, reference, blob_reader=None):
+    ''' Reads a file from the blob reader or spawning git show '''
+    if blob_reader:
+        return blob_reader.read(filename, reference)
+    return get_file(filename, reference)
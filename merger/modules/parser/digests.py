@@ -0,0 +1,63 @@
+''' Digests of the top level elements of a metadata file, used to parse
+    only the children that changed between two versions '''
+import hashlib
+import io
+
+from lxml import etree
+
+from modules.parser.models import (DIGEST_SIZE, STREAMING_MIN_BYTES,
+                                   get_element_key)
+
+
+def hash_children(filestring, dispatch):
+    ''' Returns the sorted digests of the top level elements of the file
+        by key, without building any object. The keys are read through the
+        dispatch table of the metadata class '''
+    if isinstance(filestring, str):
+        filestring = filestring.encode('utf-8')
+    digests = {}
+    for element in __iter_children(filestring):
+        digest = hashlib.blake2b(etree.tostring(element, with_tail=False),
+                                 digest_size=DIGEST_SIZE).digest()
+        digests.setdefault(get_element_key(element, dispatch),
+                           []).append(digest)
+    for values in digests.values():
+        values.sort()
+    return digests
+
+
+def get_changed_keys(old_digests, new_digests):
+    ''' Returns the keys added, removed or with different digests '''
+    return {key for key in old_digests.keys() | new_digests.keys()
+            if old_digests.get(key) != new_digests.get(key)}
+
+
+def get_minimum_tags(metadata_class):
+    ''' Returns the MINIMUM_VALUES of the class and of every class it can
+        be downcast to, those children are always parsed '''
+    tags = set(metadata_class.MINIMUM_VALUES)
+    for subclass in metadata_class.__subclasses__():
+        tags.update(get_minimum_tags(subclass))
+    return tags
+
+
+def __iter_children(filestring):
+    ''' Yields the top level elements of the file, big files are iterated
+        as they are parsed and every element is removed once yielded '''
+    if len(filestring) < STREAMING_MIN_BYTES:
+        yield from etree.fromstring(filestring).iterchildren(tag=etree.Element)
+        return
+    depth = 0
+    for event, element in etree.iterparse(io.BytesIO(filestring),
+                                          events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        yield element
+        element.clear()
+        parent = element.getparent()
+        while element.getprevious() is not None:
+            del parent[0]
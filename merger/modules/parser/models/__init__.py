@@ -1,20 +1,40 @@
 ''' Main Module Containing the abstract classes '''
-import collections
-import inspect
-import re
+import collections.abc
+import hashlib
+import io
 import sys
 
 from colorama import Fore
 from lxml import etree
 
-from modules.utils import (WARNING_LINE, print_apiname, print_differences,
-                           print_warning, write_file)
+from modules.utils import (WARNING_LINE, logger, print_apiname,
+                           print_differences, print_warning, write_file)
 from modules.utils.exceptions import (MissingRequiredAttribute,
                                       NotEnoughParams, TooManyParams)
 from modules.utils.models import ChangeType, OutputType
 
-NS_MAP = {'ns': 'http://soap.sforce.com/2006/04/metadata'}
-NS_MAP2 = {None: 'http://soap.sforce.com/2006/04/metadata'}
+NAMESPACE = 'http://soap.sforce.com/2006/04/metadata'
+NS_MAP = {'ns': NAMESPACE}
+NS_MAP2 = {None: NAMESPACE}
+# files from this size are parsed as a stream instead of a whole tree
+STREAMING_MIN_BYTES = 1024 * 1024
+DIGEST_SIZE = 16
+# key of the child objects without name, followed by their digest
+CONTENT_KEY_PREFIX = '#'
+# local names of the tags already seen, keyed by tag
+_LOCAL_TAGS = {}
+
+
+def compile_dispatch(child_objects):
+    ''' Returns the dispatch table of the child objects of a class, the
+        local tag and the child class keyed by the tag as lxml reports it,
+        with the metadata namespace and without it '''
+    dispatch = {}
+    for tag, child_class in child_objects.items():
+        tag = sys.intern(tag)
+        dispatch[f'{{{NAMESPACE}}}{tag}'] = (tag, child_class)
+        dispatch[tag] = (tag, child_class)
+    return dispatch
 
 
 class MetadataType:
@@ -27,11 +47,24 @@ class MetadataType:
     HAS_PREFIX = True
     CHILD_SEPARATOR = ''
     MINIMUM_VALUES = {}
+    # the child lists of these types are replaced when deployed, so a
+    # changed file is deployed whole, its differences are only reported
+    DEPLOYED_WHOLE = False
+    # types not composed by child types are always deployed as a file
+    COMPOSED = True
+    # (tag, child class) by tag with and without namespace, compiled from
+    # CHILD_OBJECTS when the class is created
+    CHILD_DISPATCH = {}
 
     ATTRIBUTES_LOCATION = '_attributes'
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.CHILD_DISPATCH = compile_dispatch(cls.CHILD_OBJECTS)
+
     def __init__(self, apiname, filestring=None, filepath=None,
-                 _differences=None, _composed=True, **kwargs):
+                 _differences=None, _composed=True, _selected=None,
+                 **kwargs):
         # print(apiname)
         if '/' in apiname:  # TODO try to do this in a better way
             self._apiname = apiname[apiname.rfind('/') + 1:apiname.rfind('.')]
@@ -41,58 +74,108 @@ class MetadataType:
         self._prefix = (f'{self._apiname}{self.CHILD_SEPARATOR}'
                         if self.HAS_PREFIX else '')
         self._added_values = set()
-        self._only_composed = _composed
+        self._only_composed = _composed and self.COMPOSED
         self._differences = _differences
 
+        leaf_tags = None
         if not filestring and not filepath:
             self._apiname = apiname
             self.__dict__.update(kwargs)
         else:
             if filestring and filepath:
                 raise TooManyParams()
-            if filestring:
-                self._xml = etree.fromstring(filestring)
+            if filestring and len(filestring) >= STREAMING_MIN_BYTES:
+                leaf_tags = self.__stream_metadata(filestring, _selected)
+            elif filestring:
+                leaf_tags = self.__extract_metadata(
+                    etree.fromstring(filestring).getchildren(), _selected)
             elif filepath:
-                self._xml = etree.parse(filepath)
+                leaf_tags = self.__extract_metadata(
+                    etree.parse(filepath).getroot().getchildren(), _selected)
             else:
                 raise NotEnoughParams()
-
-            self.__extract_metadata()
+            for tag_name in self.CHILD_OBJECTS:
+                if tag_name in self.__dict__:
+                    self.__dict__[tag_name] = index_children(
+                        self.__dict__[tag_name])
         self.downcast()
 
         if self.get_display_name().startswith( 'CustomObject-' ):
-            if hasattr( self, '_xml' ):
-                print( self._apiname )
-                print( self.MINIMUM_VALUES )
-                for child in self._xml.getchildren():
-                    if not isinstance( child, etree._Comment ):
-                        if not child.getchildren():
-                            child_tag = no_ns(child.tag)
-                            self.MINIMUM_VALUES.add( child_tag )
-                print( self.MINIMUM_VALUES )
-
-    def __extract_metadata(self):
-        ''' Extracts metadata for the current xml '''
-        for child in self._xml.getchildren():
-            if not isinstance( child, etree._Comment ):
-                child_tag = no_ns(child.tag)
-
-                # execute if is a handled child_object
-                if child_tag in self.CHILD_OBJECTS:
-                    if not hasattr(self, child_tag):
-                        setattr(self, child_tag, {})
+            if leaf_tags is not None:
+                # copied so leaf tags of one object do not leak into the next
+                self.MINIMUM_VALUES = set(self.MINIMUM_VALUES)
+                self.MINIMUM_VALUES.update(leaf_tags)
+                logger.debug('Minimum values of %s: %s', self._apiname,
+                             self.MINIMUM_VALUES)
+
+    def __extract_metadata(self, children, selected=None):
+        ''' Extracts metadata for the passed children of the xml, returns the
+            tags of the children without child elements. The extracted
+            objects keep a dump instead of the element, so the parsed tree
+            is freed once extracted. If a selection of tags and keys is
+            passed, the rest of children with child elements are skipped '''
+        leaf_tags = set()
+        dispatch = self.CHILD_DISPATCH
+        for child in children:
+            if not isinstance(child.tag, str):  # comments and instructions
+                continue
+            child_tag, child_class = (dispatch.get(child.tag)
+                                      or (get_local_tag(child.tag), None))
+            is_leaf = not len(child)
+            if is_leaf:
+                leaf_tags.add(child_tag)
+            elif (selected is not None and child_tag not in selected
+                  and get_element_key(child, dispatch) not in selected):
+                continue
 
-                    extracted = self.CHILD_OBJECTS[child_tag](child, self._prefix)
-                    getattr(self, child_tag)[extracted.name] = extracted
+            # execute if is a handled child_object
+            if child_class:
+                extracted = child_class(child, self._prefix)
+                # indexed once every child is extracted
+                self.__dict__.setdefault(child_tag, []).append(extracted)
 
-                # execute if is an attribute (no child elements only text)
-                elif not child.getchildren():
-                    setattr(self, child_tag, Attribute(child))
+            # execute if is an attribute (no child elements only text)
+            elif is_leaf:
+                extracted = Attribute(child)
+                self.__dict__[child_tag] = extracted
 
-                # execute if unhandled child object
-                else:
-                    print(f'{WARNING_LINE} Unsupported Metadata '
-                          f'Type {child_tag}')
+            # execute if unhandled child object
+            else:
+                logger.warning(f'{WARNING_LINE} Unsupported Metadata '
+                               f'Type {child_tag}')
+                continue
+            extracted.detach()
+        return leaf_tags
+
+    def __stream_metadata(self, filestring, selected=None):
+        ''' Extracts the metadata iterating over the parsed elements, each
+            child is extracted, detached and removed from the tree once its
+            tail is parsed, so the tree never holds more than one child.
+            Returns the tags of the children without child elements '''
+        if isinstance(filestring, str):
+            filestring = filestring.encode('utf-8')
+        leaf_tags = set()
+        depth = 0
+        pending = None
+        for event, element in etree.iterparse(io.BytesIO(filestring),
+                                              events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                # the tail of the previous child ends where this one starts
+                if depth != 2 or pending is None:
+                    continue
+            else:
+                depth -= 1
+                if depth == 1:
+                    pending = element
+                if depth != 0 or pending is None:
+                    continue
+            leaf_tags.update(self.__extract_metadata((pending,), selected))
+            parent = pending.getparent()
+            pending.clear()
+            del parent[:parent.index(pending) + 1]
+            pending = None
+        return leaf_tags
 
     def __repr__(self):
         return f'<{self.TAG_NAME}, {self._apiname}>'
@@ -104,6 +187,13 @@ class MetadataType:
 
         builders.add_child_differences(self.PACKAGE_NAME, self._apiname,
                                        differences)
+        if self.DEPLOYED_WHOLE:
+            for child_xml_name, values in differences.items():
+                print_differences(child_xml_name, values['A'], values['M'],
+                                  values['D'])
+            if any(any(values.values()) for values in differences.values()):
+                return new
+            return False
         news = dict()
 
         for child_xml_name, values in differences.items():
@@ -136,13 +226,12 @@ class MetadataType:
             print_warning(f'Only destructive changes detected')
             return False
 
-        if self.MINIMUM_VALUES:
-            for child_xml_name in news:
-                #if (child_xml_name not in self.CHILD_OBJECTS or not issubclass(self.CHILD_OBJECTS[child_xml_name],CompoundMetadataType)):
-                if child_xml_name in self.MINIMUM_VALUES:
-                    self._add_minimum_values(news, builders)
-                    self._only_composed = False
-                    break
+        # a file deployed on its own always needs its minimum values
+        if self.MINIMUM_VALUES and (not self._only_composed
+                                    or not self.MINIMUM_VALUES.isdisjoint(
+                                        news)):
+            self._add_minimum_values(news, builders)
+            self._only_composed = False
 
         return self.__class__(self._apiname, _differences=differences,
                               _composed=self._only_composed, **news)
@@ -150,7 +239,7 @@ class MetadataType:
     def _add_minimum_values(self, news, builders):
         ''' Add minimum values to the news dictionary '''
         missing_attributes = []
-        for minimum_value_name in self.MINIMUM_VALUES:
+        for minimum_value_name in sorted(self.MINIMUM_VALUES):
             if minimum_value_name in news:
                 pass
             elif hasattr(self, minimum_value_name):
@@ -209,10 +298,13 @@ class MetadataType:
         ''' Writes in a file the object '''
         folder_path = f'{delta_folder}/{self.FOLDER_NAME}'
         file_name = f'{self._apiname}.{self.EXTENSION_NAME}'
-        string = etree.tostring(self.serialize(), pretty_print=True,
-                                encoding='utf-8',
-                                xml_declaration=True).decode('utf-8')
-        write_file(folder_path, file_name, string)
+        write_file(folder_path, file_name, self.to_string())
+
+    def to_string(self):
+        ''' Returns the xml string written by to_file '''
+        return etree.tostring(self.serialize(), pretty_print=True,
+                              encoding='utf-8',
+                              xml_declaration=True).decode('utf-8')
 
     def serialize(self):
         ''' Serializes the object into an xml '''
@@ -224,9 +316,10 @@ class MetadataType:
             if tag_name.startswith('zzz_') and not added_minimum_values:
                 added_minimum_values = True
                 #element.append(etree.Comment(' === Automatically Added === '))
-            if isinstance(child_object,
-                          collections.Iterable):  # pylint: disable=E1101
-                for child in child_object:
+            if isinstance(child_object, dict):  # indexed by key when parsed
+                child_object = child_object.values()
+            if isinstance(child_object, collections.abc.Iterable):
+                for child in sorted(child_object):
                     element.append(child.get_xml())
             else:
                 element.append(child_object.get_xml())
@@ -272,12 +365,21 @@ class MetadataType:
 
 class Attribute:
     ''' Attribute class implementation '''
+    __slots__ = ('_xml', 'tag_name', 'value')
+
     def __init__(self, xml):
         self._xml = xml
-        self.tag_name = no_ns(xml.tag)
-        self.value = xml.text.strip() if xml.text else ''
-        self.name = self.tag_name
-        self._apiname = self.tag_name
+        self.tag_name = get_local_tag(xml.tag)
+        self.value = sys.intern(xml.text.strip()) if xml.text else ''
+
+    @property
+    def name(self):
+        ''' Name of the attribute, its tag '''
+        return self.tag_name
+
+    @property
+    def _apiname(self):
+        return self.tag_name
 
     def __repr__(self):
         return (f'{Fore.BLUE}<{self.tag_name}, {Fore.CYAN}'
@@ -302,17 +404,51 @@ class Attribute:
     def __ge__(self, other):
         return self.name >= other.name
 
+    def __getstate__(self):
+        return {'_xml': dump_xml(self._xml), 'tag_name': self.tag_name,
+                'value': self.value}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    def detach(self):
+        ''' Keeps a dump instead of the element, so the parsed tree can be
+            freed, the element is loaded again by get_xml '''
+        self._xml = dump_xml(self._xml)
+
     def get_xml(self):
         ''' Return the xml of the attribute '''
+        if isinstance(self._xml, tuple):
+            self._xml = load_xml(self._xml)
         return self._xml
 
 
-class ChildMetadataType:
-    ''' Abstract Metadata Type for Child Objects '''
+class _SlottedType(type):
+    ''' Gives every child metadata class empty __slots__ unless it declares
+        its own, so the parsed children never get an instance __dict__ '''
+
+    def __new__(mcs, name, bases, namespace):
+        namespace.setdefault('__slots__', ())
+        return super().__new__(mcs, name, bases, namespace)
+
+
+class ChildMetadataType(metaclass=_SlottedType):
+    ''' Abstract Metadata Type for Child Objects, the values of the child
+        are kept as a tuple of (tag, value) pairs sorted by tag, read as
+        attributes. Values are interned strings, frozensets of repeated
+        values or tuples of (name, child object) pairs. The digest of the
+        values is computed once, so equality is a digest comparison '''
+    __slots__ = ('_xml', '_apiname', 'name', '_fields', '_digest')
     TAG_NAME = ''
     PACKAGE_NAME = ''
     ID_ATTRIBUTE = ''
-    CHILD_OBJECTS = []
+    CHILD_OBJECTS = {}
+    CHILD_DISPATCH = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.CHILD_DISPATCH = compile_dispatch(cls.CHILD_OBJECTS)
 
     def __init__(self, xml, name_prefix=''):
         self._xml = xml
@@ -321,8 +457,6 @@ class ChildMetadataType:
         if self.ID_ATTRIBUTE:
             self._apiname = getattr(self, self.ID_ATTRIBUTE, None)
             if not self._apiname:
-                print( self.ID_ATTRIBUTE )
-                print( dir( self ) )
                 raise MissingRequiredAttribute(self.__class__.__name__,
                                                self.ID_ATTRIBUTE)
             self.name = f'{name_prefix}{self._apiname}'
@@ -331,37 +465,47 @@ class ChildMetadataType:
 
     def __extract_metadata(self):
         ''' Extracts metadata for the current xml '''
-        for child in self._xml.getchildren():
-            if not isinstance( child, etree._Comment ):
-                child_tag = no_ns(child.tag)
-
-                # execute if is a handled child_object
-                if child_tag in self.CHILD_OBJECTS:
-                    if not hasattr(self, child_tag):
-                        setattr(self, child_tag, {})
-
-                    extracted = self.CHILD_OBJECTS[child_tag](child, '')
-                    getattr(self, child_tag)[extracted.name] = extracted
-
-                # execute if is an attribute (no child elements only text)
-                elif not child.getchildren():
-                    if hasattr(self, child_tag):  # list of values with no children
-                        already_saved = getattr(self, child_tag)
-                        if isinstance(already_saved, set):
-                            already_saved.add(child.text)
-                        else:
-                            # TODO im sure there is a better way to do this
-                            new_set = set()
-                            new_set.add(already_saved)
-                            already_saved = new_set
-                        setattr(self, child_tag, already_saved)
-                    else:
-                        text_value = child.text.strip() if child.text else ''
-                        setattr(self, child_tag, text_value)
-
-                # execute if unhandled child object
+        fields = {}
+        dispatch = self.CHILD_DISPATCH
+        for child in self._xml:
+            if not isinstance(child.tag, str):  # comments and instructions
+                continue
+            child_tag, child_class = (dispatch.get(child.tag)
+                                      or (get_local_tag(child.tag), None))
+
+            # execute if is a handled child_object
+            if child_class:
+                extracted = child_class(child, '')
+                fields.setdefault(child_tag, []).append(extracted)
+
+            # execute if is an attribute (no child elements only text)
+            elif not len(child):
+                text_value = (sys.intern(child.text.strip())
+                              if child.text else '')
+                if child_tag in fields:  # list of values with no children
+                    already_saved = fields[child_tag]
+                    if not isinstance(already_saved, set):
+                        already_saved = fields[child_tag] = {already_saved}
+                    already_saved.add(text_value)
                 else:
-                    print(f'{WARNING_LINE} Unsupported Metadata Type {child_tag}')
+                    fields[child_tag] = text_value
+
+            # execute if unhandled child object
+            else:
+                logger.warning(f'{WARNING_LINE} Unsupported Metadata '
+                               f'Type {child_tag}')
+
+        self._fields = tuple(sorted((tag, freeze_value(value))
+                                    for tag, value in fields.items()))
+        self._digest = get_digest(self._fields)
+
+    def __getattr__(self, name):
+        if not name.startswith('_'):
+            for tag, value in self._fields:
+                if tag == name:
+                    return value
+        raise AttributeError(f'{self.__class__.__name__} has no attribute '
+                             f'{name}')
 
     def __repr__(self):
         value = ''
@@ -374,10 +518,10 @@ class ChildMetadataType:
         return f'{self.name}'
 
     def __hash__(self):
-        return hash(str(self))
+        return hash(self.get_key())
 
     def __eq__(self, value2):
-        return not bool(self.differences(value2))
+        return self.name == value2.name and self._digest == value2._digest
 
     def __lt__(self, other):
         return self.name < other.name
@@ -391,26 +535,55 @@ class ChildMetadataType:
     def __ge__(self, other):
         return self.name >= other.name
 
+    def __getstate__(self):
+        state = {slot: getattr(self, slot)
+                 for slot in ('_apiname', 'name', '_fields', '_digest')
+                 if hasattr(self, slot)}
+        state['_xml'] = dump_xml(self._xml)
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    def detach(self):
+        ''' Keeps a dump instead of the element, also in the nested child
+            objects, so the parsed tree can be freed, the element is loaded
+            again by get_xml '''
+        self._xml = dump_xml(self._xml)
+        for _, value in self._fields:
+            if isinstance(value, tuple):
+                for _, child in value:
+                    child.detach()
+
     def serialize(self, output_type):
         ''' Serializes object into the selected output '''
         if output_type == OutputType.XML:
-            return self._xml
+            return self.get_xml()
         message = (f'Output Type {output_type} is not yet available for '
                    f'serialization')
         raise NotImplementedError(message)
 
     def differences(self, value2):
-        ''' Gets the differences between two instances '''
-        values1 = self.__dict__
-        values2 = value2.__dict__
+        ''' Gets the tags with different values between two instances '''
+        values1 = dict(self._fields)
+        values2 = dict(value2._fields)
         missing = set(values1).symmetric_difference(set(values2))
-        different = {key for key, value in self.__dict__.items()
-                     if not key.startswith('_')
-                     and value != values2.get(key, '')}
+        different = {key for key, value in values1.items()
+                     if value != values2.get(key, '')}
+        if self.name != value2.name:
+            different.add('name')
         return missing.union(different)
 
+    def get_key(self):
+        ''' Returns the identity of the child, its name or its digest if it
+            has no name '''
+        return self.name or f'{CONTENT_KEY_PREFIX}{self._digest.hex()}'
+
     def get_xml(self):
         ''' Returns the xml of the object '''
+        if isinstance(self._xml, tuple):
+            self._xml = load_xml(self._xml)
         return self._xml
 
 
@@ -428,20 +601,114 @@ class ChildObject(ChildMetadataType):
                 f'{self._apiname}{Fore.BLUE}>{Fore.RESET}')
 
 
-def no_ns(tag):
-    ''' Erases the namespace of the tag '''
-    return re.sub(r'\{.+\}', '', tag)
+class LeafMetadataType(ChildMetadataType):
+    ''' Child without child elements that is repeated in the file, like the
+        permission sets of a group, named by its own text '''
+    def __init__(self, xml, name_prefix=''):
+        super().__init__(xml, name_prefix)
+        self._apiname = sys.intern(xml.text.strip()) if xml.text else ''
+        self.name = f'{name_prefix}{self._apiname}'
+
+    def __repr__(self):
+        return (f'{Fore.BLUE}<{Fore.CYAN}'
+                f'{self._apiname}{Fore.BLUE}>{Fore.RESET}')
+
+
+def freeze_value(value):
+    ''' Returns the immutable form of an extracted value '''
+    if isinstance(value, set):
+        return frozenset(value)
+    if isinstance(value, list):
+        return tuple(sorted(index_children(value).items()))
+    return value
+
+
+def index_children(children):
+    ''' Returns the child objects keyed by name, the last one wins. Child
+        objects without name are keyed by their content digest, unless
+        there is only one of them under the tag which keeps the empty
+        name so its changes are still modifications '''
+    indexed = {}
+    anonymous = []
+    for child in children:
+        if child.name:
+            indexed[child.name] = child
+        else:
+            anonymous.append(child)
+    if len(anonymous) == 1:
+        indexed[''] = anonymous[0]
+    else:
+        for child in anonymous:
+            indexed[child.get_key()] = child
+    return indexed
+
+
+def get_digest(fields):
+    ''' Returns the digest of the values of a child object, nested child
+        objects add their name and their own digest '''
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for tag, value in fields:
+        digest.update(tag.encode('utf-8'))
+        if isinstance(value, str):
+            digest.update(b'\x00s' + value.encode('utf-8'))
+        elif isinstance(value, frozenset):
+            digest.update(b'\x00f'
+                          + '\x00'.join(sorted(value)).encode('utf-8'))
+        else:
+            for name, child in value:
+                digest.update(b'\x00c' + name.encode('utf-8') + b'\x00'
+                              + child._digest)
+        digest.update(b'\x01')
+    return digest.digest()
+
+
+def get_element_key(element, dispatch):
+    ''' Returns the key of a top level element, its tag and the value of
+        the ID attribute of its child object class if any '''
+    tag, child_class = (dispatch.get(element.tag)
+                        or (get_local_tag(element.tag), None))
+    id_attribute = child_class.ID_ATTRIBUTE if child_class else None
+    if id_attribute:
+        for child in element.iterchildren(tag=etree.Element):
+            if get_local_tag(child.tag) == id_attribute:
+                return tag, child.text.strip() if child.text else ''
+    return tag, None
+
+
+def get_local_tag(tag):
+    ''' Returns the interned tag without namespace, computed once by tag '''
+    local_tag = _LOCAL_TAGS.get(tag)
+    if local_tag is None:
+        local_tag = _LOCAL_TAGS[tag] = sys.intern(tag.rpartition('}')[2])
+    return local_tag
+
+
+def dump_xml(xml):
+    ''' Returns a picklable representation of the passed element, an
+        element already dumped is returned as is '''
+    if isinstance(xml, tuple):
+        return xml
+    return etree.tostring(xml, with_tail=False), xml.tail
+
+
+def load_xml(dumped):
+    ''' Rebuilds an element from the output of dump_xml '''
+    xml_bytes, tail = dumped
+    xml = etree.fromstring(xml_bytes)
+    xml.tail = tail
+    return xml
 
 
 def get_child_objects(module):
     ''' Return all the Child Classes of the passed module '''
     return {class_.TAG_NAME: class_
-            for name, class_ in inspect.getmembers(sys.modules[module],
-                                                   inspect.isclass)
-            if issubclass(class_, ChildMetadataType)
+            for name, class_ in sorted(vars(sys.modules[module]).items())
+            if isinstance(class_, type)
+            and issubclass(class_, ChildMetadataType)
             and name != ChildMetadataType.__name__
             and name != CompoundMetadataType.__name__
             and name != ChildObject.__name__
+            and name != LeafMetadataType.__name__
             }
 
 
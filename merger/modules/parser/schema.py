@@ -0,0 +1,146 @@
+''' Metadata Schemas Module, the metadata types broken down into child types
+    are described as data in the schemas folder and compiled once into
+    model classes, the dispatch tables of the classes are built when the
+    classes are created '''
+import json
+import os
+import sys
+
+from colorama import Fore
+
+from modules.parser.models import (ChildMetadataType, CompoundMetadataType,
+                                   LeafMetadataType, MetadataType)
+from modules.utils import PWD
+from modules.utils.exceptions import InvalidSchema
+
+SCHEMAS_FOLDER = f'{PWD}/resources/schemas'
+SCHEMA_EXTENSION = '.json'
+
+SCHEMA_KEYS = {'package_name', 'tag', 'folder', 'extension',
+               'child_separator', 'has_prefix', 'minimum_values',
+               'composed', 'deployed_whole', 'parsed', 'children'}
+CHILD_KEYS = {'tag', 'name', 'kind', 'package_name', 'id', 'repr',
+              'children'}
+CHILD_KINDS = {'child': ChildMetadataType,
+               'compound': CompoundMetadataType,
+               'leaf': LeafMetadataType}
+
+
+def load_schemas(folder=SCHEMAS_FOLDER):
+    ''' Compiles every schema of the folder, the classes are kept as
+        attributes of this module so the parsed objects can be pickled.
+        Returns the classes by package name and the ones that are parsed '''
+    metadata_types = {}
+    parsed_types = {}
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith(SCHEMA_EXTENSION):
+            continue
+        with open(f'{folder}/{filename}', 'r') as schema_file:
+            try:
+                schema = json.load(schema_file)
+            except ValueError as exception:
+                raise InvalidSchema(filename, exception)
+        metadata_class = compile_schema(schema, filename)
+        if (metadata_class.PACKAGE_NAME in metadata_types
+                or hasattr(sys.modules[__name__], metadata_class.__name__)):
+            raise InvalidSchema(filename, f'type \'{metadata_class.__name__}'
+                                          f'\' is already defined')
+        setattr(sys.modules[__name__], metadata_class.__name__,
+                metadata_class)
+        metadata_types[metadata_class.PACKAGE_NAME] = metadata_class
+        if schema.get('parsed', True):
+            parsed_types[metadata_class.PACKAGE_NAME] = metadata_class
+    return metadata_types, parsed_types
+
+
+def compile_schema(schema, schema_name):
+    ''' Returns the metadata class described by the schema, its children
+        in the order of the schema '''
+    __check_keys(schema, SCHEMA_KEYS, {'package_name', 'children'},
+                 schema_name)
+    name = schema['package_name']
+    namespace = {'__module__': __name__,
+                 '__qualname__': name,
+                 '__doc__': f' {name} compiled from {schema_name} ',
+                 'TAG_NAME': schema.get('tag', name),
+                 'PACKAGE_NAME': name,
+                 'FOLDER_NAME': schema.get('folder', ''),
+                 'EXTENSION_NAME': schema.get('extension', ''),
+                 'CHILD_SEPARATOR': schema.get('child_separator', '.'),
+                 'HAS_PREFIX': schema.get('has_prefix', True),
+                 'MINIMUM_VALUES': set(schema.get('minimum_values', ())),
+                 'COMPOSED': schema.get('composed', True),
+                 'DEPLOYED_WHOLE': schema.get('deployed_whole', False),
+                 'CHILD_OBJECTS': __compile_children(
+                     schema['children'], name, schema_name)}
+    metadata_class = type(name, (MetadataType,), namespace)
+    __set_child_classes(metadata_class)
+    return metadata_class
+
+
+def __compile_children(children, qualname, schema_name):
+    ''' Returns the child classes by tag, the nested children are compiled
+        first so the dispatch table of each class is complete '''
+    child_objects = {}
+    for child in children:
+        __check_keys(child, CHILD_KEYS, {'tag'}, schema_name)
+        tag = child['tag']
+        if tag in child_objects:
+            raise InvalidSchema(schema_name, f'child \'{tag}\' of '
+                                             f'{qualname} is repeated')
+        kind = child.get('kind', 'child')
+        if kind not in CHILD_KINDS:
+            raise InvalidSchema(schema_name, f'unknown kind \'{kind}\' of '
+                                             f'child \'{tag}\'')
+        if (kind == 'compound') != ('package_name' in child):
+            raise InvalidSchema(schema_name, f'only compound children have '
+                                             f'package name, child \'{tag}\'')
+        if kind == 'leaf' and ('id' in child or 'children' in child):
+            raise InvalidSchema(schema_name, f'leaf child \'{tag}\' can not '
+                                             f'have id nor children')
+        if child.get('repr', 'type') != 'type':
+            raise InvalidSchema(schema_name, f'unknown repr of child '
+                                             f'\'{tag}\'')
+        base = CHILD_KINDS[kind]
+        name = child.get('name', f'{tag[0].upper()}{tag[1:]}')
+        namespace = {'__module__': __name__,
+                     '__qualname__': f'{qualname}.{name}',
+                     '__doc__': f' {name} - {qualname} ',
+                     'TAG_NAME': tag,
+                     'ID_ATTRIBUTE': child.get('id', ''),
+                     'CHILD_OBJECTS': __compile_children(
+                         child.get('children', ()), f'{qualname}.{name}',
+                         schema_name)}
+        if kind == 'compound':
+            namespace['PACKAGE_NAME'] = child['package_name']
+        if child.get('repr') == 'type':
+            namespace['__repr__'] = get_type_repr
+        child_objects[tag] = type(base)(name, (base,), namespace)
+    return child_objects
+
+
+def get_type_repr(child):
+    ''' Repr of the children shown by the name of their class instead of
+        their ID '''
+    return (f'{Fore.BLUE}<{Fore.CYAN}{child.__class__.__name__}'
+            f'{Fore.BLUE}>{Fore.RESET}')
+
+
+def __set_child_classes(parent_class):
+    ''' Keeps the child classes as attributes of their parent, reachable
+        by their qualified name when pickled '''
+    for child_class in parent_class.CHILD_OBJECTS.values():
+        setattr(parent_class, child_class.__name__, child_class)
+        __set_child_classes(child_class)
+
+
+def __check_keys(schema, allowed_keys, required_keys, schema_name):
+    ''' Raises InvalidSchema on unknown or missing keys '''
+    unknown = set(schema) - allowed_keys
+    missing = required_keys - set(schema)
+    if unknown or missing:
+        raise InvalidSchema(schema_name, f'unknown keys {sorted(unknown)}, '
+                                         f'missing keys {sorted(missing)}')
+
+
+METADATA_TYPES, PARSED_TYPES = load_schemas()
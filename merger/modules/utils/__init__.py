@@ -1,18 +1,13 @@
 ''' Utils module '''
 import os
-import re
-import json
 import shutil
 import subprocess
 
-from colorama import Fore, Style, init
-from lxml import etree
+from colorama import Fore, Style
 
-import __main__
 from modules.utils.exceptions import NotCreatedDescribeLog
-from modules.utils.models import MetadataType, MetadataTypeFromJSON
-
-init(autoreset=True)
+from modules.utils import logger
+from modules.utils.models import DescribeIndex
 
 INFO_TAG = f'{Fore.YELLOW}[INFO]{Fore.RESET}'
 ERROR_TAG = f'{Fore.RED}[ERROR]{Fore.RESET}'
@@ -24,10 +19,14 @@ WARNING_LINE = f'{Fore.MAGENTA}[WARNING]'
 
 API_VERSION = '44.0'
 DELTA_FOLDER = 'srcToDeploy'
+ARTIFACTS_FOLDER = 'artifacts_folder'
+JOBS_FOLDER = 'merger_jobs'
 SOURCE_FOLDER = 'src'
 TEMPLATE_FILE = "expansionPanels.html"
 
-PWD = os.path.dirname(os.path.realpath(__main__.__file__))
+# resolved from this file, breakdown workers may not have a __main__ file
+PWD = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.realpath(__file__))))
 
 FOLDER_PATTERN = ['│   ', '    ']
 FILE_PATTERN = ['├─ ', '└─ ']
@@ -38,18 +37,28 @@ ENV_GITLAB_ACCESS_TOKEN = 'GITLAB_ACCESS_TOKEN'
 
 def write_file(folder, filename, content, print_log=False):
     ''' Writes into a file, creating the folders if not exists '''
-    if print_log:
-        print(f'\t- Writting \'{filename}\' in \'{folder}\''
-              f'{Style.NORMAL}')
-    if not os.path.exists(folder):
-        os.makedirs(folder)
-    with open(f'{folder}/{filename}', 'w', encoding='utf-8') as output_file:
+    with open_file(folder, filename, print_log) as output_file:
         output_file.write(content)
 
 
+def open_file(folder, filename, print_log=False, binary=False):
+    ''' Opens a new file for writing, creating the folders if not exists '''
+    if print_log:
+        logger.info(f'\t- Writting \'{filename}\' in \'{folder}\''
+                    f'{Style.NORMAL}')
+    os.makedirs(folder, exist_ok=True)
+    # never write through a hard link into the working tree
+    remove_file(f'{folder}/{filename}')
+    if binary:
+        return open(f'{folder}/{filename}', 'wb')
+    return open(f'{folder}/{filename}', 'w', encoding='utf-8')
+
+
 def call_subprocess(command, verbose=True):
     ''' Calls subprocess, returns output and return code,
         if verbose flag is active it will print the output '''
+    # the buffered messages are shown before anything the command prints
+    logger.flush()
     try:
         stdout = subprocess.check_output(command, stderr=subprocess.STDOUT,
                                          shell=True).decode('utf-8')
@@ -60,14 +69,15 @@ def call_subprocess(command, verbose=True):
         output = exc.output.decode('utf-8')
         returncode = exc.returncode
         if verbose:
-            print(f'{ERROR_TAG} Subprocess returned non-zero exit '
-                  f'status {returncode}')
-            print_output(output, color=Fore.RED)
+            logger.error(f'{ERROR_TAG} Subprocess returned non-zero exit '
+                         f'status {returncode}')
+            print_output(output, color=Fore.RED, level=logger.ERROR)
         return output, returncode
 
 
 def pprint_xml(xml, declaration=True):
     ''' Pretty print the passed xml '''
+    from lxml import etree  # pylint: disable=C0415
     return etree.tostring(xml, pretty_print=True,
                           encoding='utf-8',
                           xml_declaration=declaration).decode('utf-8')
@@ -75,14 +85,16 @@ def pprint_xml(xml, declaration=True):
 
 def print_apiname(apiname, package_name):
     ''' Print a warning message '''
+    if not logger.is_enabled(logger.INFO):
+        return
     indent = ' ' * 3
-    print(f'{Style.DIM}{indent}▶︎ {Fore.GREEN}[{package_name}] {Fore.MAGENTA}'
-          f'{apiname} {Fore.RESET}')
+    logger.info(f'{Style.DIM}{indent}▶︎ {Fore.GREEN}[{package_name}] '
+                f'{Fore.MAGENTA}{apiname} {Fore.RESET}')
 
 
 def print_differences(child_xml_name, added, modified, erased):
     ''' Pretty print differences '''
-    if added or modified or erased:
+    if (added or modified or erased) and logger.is_enabled(logger.INFO):
         added_string = __difference_line(f'Added ({len(added)})',
                                          sorted(added))
         modified_string = __difference_line(f'Modified ({len(modified)})',
@@ -90,15 +102,16 @@ def print_differences(child_xml_name, added, modified, erased):
         erased_string = __difference_line(f'Erased ({len(erased)})',
                                           sorted(erased))
         indent = ' ' * 6
-        print(f'{Style.DIM}{indent}► {Fore.MAGENTA}{child_xml_name}'
-              f'{Fore.RESET}:\n{added_string}{modified_string}{erased_string}',
-              end='')
+        logger.info(f'{Style.DIM}{indent}► {Fore.MAGENTA}{child_xml_name}'
+                    f'{Fore.RESET}:\n{added_string}{modified_string}'
+                    f'{erased_string}'.rstrip('\n'))
 
 
 def print_warning(message):
     ''' Print a warning message '''
     indent = ' ' * 6
-    print(f'{Style.DIM}{indent}⚠ {Fore.MAGENTA}{message}{Fore.RESET}')
+    logger.warning(f'{Style.DIM}{indent}⚠ {Fore.MAGENTA}{message}'
+                   f'{Fore.RESET}')
 
 
 def __difference_line(name, values):
@@ -109,10 +122,12 @@ def __difference_line(name, values):
     return ''
 
 
-def print_output(output, color='', tab_level=1):
+def print_output(output, color='', tab_level=1, level=logger.INFO):
     ''' Prints output in the color passed '''
+    if not logger.is_enabled(level):
+        return
     formated = '\t' * tab_level + output.replace('\n', '\n' + '\t' * tab_level)
-    print(f'{color}{formated}{Fore.RESET}')
+    logger.log(level, f'{color}{formated}{Fore.RESET}')
 
 
 def truncate_string(value, size, fill=False):
@@ -125,9 +140,20 @@ def truncate_string(value, size, fill=False):
     return string_value
 
 
-def copy_parents(src, dest_folder, dir_offset=0):
+def copy_parents(src, dest_folder, dir_offset=0, copier=None):
     ''' Copies src tree into dest, offset (optional) omits n
         folders of the src path'''
+    src, dest_file_path = get_parents_destination(src, dest_folder,
+                                                  dir_offset)
+    os.makedirs(os.path.dirname(dest_file_path), exist_ok=True)
+
+    copy_file(src, dest_file_path, True, copier)
+    copy_file(f'{src}-meta.xml', f'{dest_file_path}-meta.xml', True, copier)
+
+
+def get_parents_destination(src, dest_folder, dir_offset=0):
+    ''' Returns the src without the meta suffix and the path it is copied
+        to by copy_parents '''
     if src.endswith('-meta.xml'):  # if its meta file, erase meta part
         src = src[:-len('-meta.xml')]
     prev_offset = (0 if dir_offset == 0 else
@@ -137,18 +163,18 @@ def copy_parents(src, dest_folder, dir_offset=0):
     src_dirs = '' if post_offset == -1 else src[prev_offset:post_offset]
     src_filename = src[post_offset + 1:]
 
-    os.makedirs(f'{dest_folder}/{src_dirs}', exist_ok=True)
-
-    dest_file_path = f'{dest_folder}/{src_dirs}/{src_filename}'
-    copy_file(src, dest_file_path, True)
-    copy_file(f'{src}-meta.xml', f'{dest_file_path}-meta.xml', True)
+    return src, f'{dest_folder}/{src_dirs}/{src_filename}'
 
 
-def copy_file(src, dest, handle_errors):
+def copy_file(src, dest, handle_errors, copier=None):
     ''' Copy a file from source to dest, if handle flag is activated,
-        an an exception is launch while trying to copy it will not fail '''
+        an an exception is launch while trying to copy it will not fail.
+        The copy strategy of the copier is used if passed '''
     try:
-        shutil.copy(src, dest)
+        if copier:
+            copier.copy(src, dest)
+        else:
+            shutil.copy(src, dest)
     except Exception as exception:  # noqa # pylint: disable=W0703,W0612
         if not handle_errors:
             raise exception
@@ -158,72 +184,13 @@ def copy_file(src, dest, handle_errors):
 
 def get_xml_names(filepath):
     ''' Extracts the xml names from a describe '''
+    # pickle and hashlib are only needed by the commands reading a describe
+    from modules.utils.describe_cache import (  # pylint: disable=C0415
+        load_describe)
     if not os.path.isfile(filepath):
         raise NotCreatedDescribeLog(filepath)
-    
-    with open(filepath, 'r') as file:
-        try:
-            data    = json.load( file )
-            isJSON  = True
-        except:
-            data    = file.read()
-            isJSON  = False
-
-    if isJSON:
-        dictionary = getXmlNamesFromJSON( data )
-    else:
-        dictionary = getXmlNamesFromLog( data )
-
-    return dictionary
-
-
-def getXmlNamesFromJSON(data):
-
-    dictionary = {}
-
-    for metadataInfo in data[ 'metadataObjects' ]:
-        inFolder        = metadataInfo[ 'inFolder' ]
-        hasMetadata     = metadataInfo[ 'metaFile' ]
-        childObjects    = metadataInfo[ 'childXmlNames' ] if 'childXmlNames' in metadataInfo else []
-        suffix          = metadataInfo[ 'suffix' ] if 'suffix' in metadataInfo else ''
-        xmlName         = metadataInfo[ 'xmlName' ]
-        dirName         = metadataInfo[ 'directoryName' ]
-        dictKey         = dirName
-
-        if 'territory2Models' == dirName and 'territory2Model' != suffix:
-            dictKey = suffix
-        dictionary[ dictKey ] = MetadataTypeFromJSON( xmlName, dirName, suffix, hasMetadata, inFolder, childObjects )
-
-    return dictionary
-
-
-def getXmlNamesFromLog( data ):
-
-    regex_string = (r'\*+\nXMLName: ([a-zA-Z0-9]+)\nDirName: ([a-zA-Z0-9]+)\nSuffix:'
-                    r' ([a-zA-Z0-9]+)\nHasMetaFile: ([a-zA-Z]+)\nInFolder:'
-                    r' ([a-zA-Z]+)\nChildObjects: (?:([a-zA-Z,]+),|)\*+')
-    
-    xml_names   = re.findall(regex_string, data, re.MULTILINE)
-    dictionary  = dict()
-
-    for (xml_name, dir_name, suffix, has_metadata,
-         in_folder, child_objects) in xml_names:
-        in_folder = castToBoolean( in_folder )
-        has_metadata = castToBoolean( has_metadata )
-        dict_key = dir_name
-        if 'territory2Models' == dir_name and 'territory2Model' != suffix:
-            dict_key = suffix
-        dictionary[dict_key] = MetadataType(xml_name, dir_name, suffix,
-                                            has_metadata, in_folder,
-                                            child_objects)
-    return dictionary
-
-
-def castToBoolean( value ):
-    boolValue = False
-    if 'true' == value:
-        boolValue = True
-    return boolValue
+    return DescribeIndex(load_describe(filepath))
+
 
 def tree(path, do_output=True, print_hidden=False, max_depth=100, margin=1):
     """Print file and directory tree starting at path.
@@ -284,7 +251,7 @@ def tree(path, do_output=True, print_hidden=False, max_depth=100, margin=1):
 
     output += f'\n\t{file_count} files, {directory_count} directories\n'
 
-    print(f'{Style.DIM}{output}{Style.NORMAL}')
+    logger.info(f'{Style.DIM}{output}{Style.NORMAL}')
 
 
 def remove_file(file_path):
@@ -296,7 +263,7 @@ def remove_file(file_path):
 def check_exist(path):
     ''' Detects if a file exists '''
     if not os.path.exists(path):
-        print(f"{INFO_TAG} The path {path} didn't exists.")
+        logger.info(f"{INFO_TAG} The path {path} didn't exists.")
         return False
     return True
 
@@ -306,7 +273,7 @@ def print_key_value_list(top_message, items):
     message = f'{top_message}\n'
     for key, value in items:
         message += f'{key_value_list(key, value)}\n'
-    print(message)
+    logger.info(message)
 
 
 def key_value_list(key, value):
@@ -3,9 +3,13 @@ import argparse
 import os
 import sys
 
+from modules.deploy_units import MAX_COMPONENTS
 from modules.git.models import PrettyFormat, Version
-from modules.utils import (API_VERSION, DELTA_FOLDER, ENV_GITLAB_ACCESS_TOKEN,
-                           ENV_PROJECT_ID, SOURCE_FOLDER)
+from modules.utils import (API_VERSION, ARTIFACTS_FOLDER, DELTA_FOLDER,
+                           ENV_GITLAB_ACCESS_TOKEN, ENV_PROJECT_ID,
+                           JOBS_FOLDER, SOURCE_FOLDER)
+from modules.utils.copiers import COPIERS
+from modules.utils.logger import LOG_FORMATS
 from modules.utils.models import OutputType
 
 
@@ -16,29 +20,43 @@ def parse_args():
     parser = argparse.ArgumentParser(description=description)
     subparsers = parser.add_subparsers(help='commands', dest='option')
     subparsers.required = True
+    log_parser = __log_parser()
+    jobs_parser = __jobs_parser()
 
-    subparsers.add_parser('version', help='Returns the version of the script')
+    subparsers.add_parser('version', help='Returns the version of the script',
+                          parents=[log_parser])
 
     merger_help = ('Builds delta package, from the diff between source and '
                    'target branch after merging them')
-    __merge_parser(subparsers.add_parser('merge_delta', help=merger_help))
+    __merge_parser(subparsers.add_parser('merge_delta', help=merger_help,
+                                         parents=[log_parser, jobs_parser]))
 
     build_help = ('Builds delta package, from the diff between two specified '
                   'references (commit, tag or branch)')
-    __build_parser(subparsers.add_parser('build_delta', help=build_help))
+    __build_parser(subparsers.add_parser('build_delta', help=build_help,
+                                         parents=[log_parser, jobs_parser]))
 
     list_mr_help = ('Lists all the available MR that were targeted to source '
                     'branch and filter those that are already in the target')
-    __list_mr(subparsers.add_parser('list_mr', help=list_mr_help))
+    __list_mr(subparsers.add_parser('list_mr', help=list_mr_help,
+                                    parents=[log_parser]))
 
     list_mc_help = ('Lists all the Merge Commits, can filter to only get the '
                     'merge commits in a current branch')
-    __list_mc(subparsers.add_parser('list_mc', help=list_mc_help))
+    __list_mc(subparsers.add_parser('list_mc', help=list_mc_help,
+                                    parents=[log_parser]))
+
+    record_help = ('Records a ref as the last deployment to an environment,'
+                   ' run once the deploy succeeded,'
+                   ' used by build_delta --environment as the delta start')
+    __record_parser(subparsers.add_parser('record_deploy', help=record_help,
+                                          parents=[log_parser]))
 
     release_help = ('Creates release branch from a list of MR iids '
                     'merging them into the target branch')
     __release_parser(subparsers.add_parser('create_release',
-                                           help=release_help))
+                                           help=release_help,
+                                           parents=[log_parser]))
 
     args = parser.parse_args()
 
@@ -57,11 +75,50 @@ def parse_args():
         if args.version_type:
             raise NotImplementedError('Not implemented yet')  # TODO
     if args.option == 'build_delta':
-        if 'target' not in args or not args.target:
+        # with an environment the target is the last deployment recorded
+        if not args.target and not args.environment:
             args.target = f'{args.source}~1'
     return args
 
 
+def __log_parser():
+    ''' Returns a parser with the output arguments shared by every command '''
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Only prints warnings, errors and the requested '
+                             'output')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Prints debug messages')
+    parser.add_argument('-lf', '--log-format', default='text',
+                        choices=LOG_FORMATS,
+                        help='Format of the output, \'jsonl\' prints a JSON '
+                             'object per message, default=\'text\'')
+    return parser
+
+
+def __jobs_parser():
+    ''' Returns a parser with the arguments shared by the commands that can
+        run in a worktree of a pool '''
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('-af', '--artifacts-folder', default=ARTIFACTS_FOLDER,
+                        help='Folder of the reports of the delta, '
+                             f'default=\'{ARTIFACTS_FOLDER}\'')
+    parser.add_argument('-wp', '--worktree-pool', default=0, type=int,
+                        metavar='SIZE',
+                        help='Runs in a worktree of a pool of SIZE shared by '
+                             'the jobs of the clone, so several jobs can run '
+                             'at the same time, the delta and artifacts '
+                             'folders are written in the folder of the job, '
+                             'default=0 (runs in the current folder)')
+    parser.add_argument('-jf', '--jobs-folder', default=JOBS_FOLDER,
+                        help='With --worktree-pool, folder of the folders '
+                             f'of the jobs, default=\'{JOBS_FOLDER}\'')
+    parser.add_argument('-jn', '--job-name', default=f'job_{os.getpid()}',
+                        help='With --worktree-pool, name of the folder of '
+                             'the job, default=\'job_<process id>\'')
+    return parser
+
+
 def __merge_parser(subparser):
     ''' Adds arguments for merge subparser '''
     subparser.add_argument('-r', '--remote', default='origin',
@@ -96,6 +153,56 @@ def __merge_parser(subparser):
     subparser.add_argument('-pt', '--print-tree', action='store_true',
                            dest='print_tree',
                            help='Prints complete tree in the stdout')
+    subparser.add_argument('-j', '--jobs', default=1, type=int,
+                           help='Number of processes used to breakdown '
+                                'compound objects, default=1')
+    subparser.add_argument('-fr', '--find-renames', type=int,
+                           dest='rename_threshold', metavar='PERCENT',
+                           help='Similarity threshold to detect renames, '
+                                'default is the git default (50)')
+    subparser.add_argument('-fc', '--find-copies', type=int,
+                           dest='copy_threshold', metavar='PERCENT',
+                           help='Similarity threshold to detect copies, '
+                                'disabled by default')
+    subparser.add_argument('-cm', '--copy-mode', default='copy',
+                           choices=list(COPIERS),
+                           help='Strategy to copy files into the delta '
+                                'folder, \'reflink\' clones them if the '
+                                'filesystem supports it, \'hardlink\' only if'
+                                ' the delta folder is disposable, '
+                                'default=\'copy\'')
+    subparser.add_argument('-io', '--io-threads', default=8, type=int,
+                           help='Number of threads used to copy the files '
+                                'into the delta folder, default=8')
+    subparser.add_argument('-pl', '--plan', action='store_true',
+                           help='Only sizes the delta, writes a JSON summary '
+                                'in the artifacts folder without copying '
+                                'files nor writing the packages, the branches '
+                                'are merged in memory and nothing is checked '
+                                'out nor committed')
+    subparser.add_argument('-pf', '--profile', action='store_true',
+                           help='Dumps the cProfile stats of the differences '
+                                'handling in the artifacts folder')
+    subparser.add_argument('-lr', '--lazy-report', action='store_true',
+                           help='Writes the XML snippets of the HTML report '
+                                'in chunks next to it, loaded when a panel is'
+                                ' expanded, for deltas too big to inline')
+    subparser.add_argument('-mc', '--max-components', default=MAX_COMPONENTS,
+                           type=int,
+                           help='Components of a deploy, bigger deltas are '
+                                'also split into deploy units next to the '
+                                'delta folder, deployed in their order, '
+                                '0 to disable, '
+                                f'default={MAX_COMPONENTS}')
+    subparser.add_argument('-im', '--in-memory', action='store_true',
+                           help='Merges with git merge-tree without checking'
+                                ' out the branches, the files are written '
+                                'from the merged tree, needs git 2.38')
+    subparser.add_argument('-cmt', '--commit', action='store_true',
+                           dest='do_commit',
+                           help='With --in-memory, creates the merge commit '
+                                'and moves the target branch to it, not '
+                                'created by default')
 
 
 
@@ -135,6 +242,68 @@ def __build_parser(subparser):
     subparser.add_argument('-pt', '--print-tree', action='store_true',
                            dest='print_tree',
                            help='Prints complete tree in the stdout')
+    subparser.add_argument('-j', '--jobs', default=1, type=int,
+                           help='Number of processes used to breakdown '
+                                'compound objects, default=1')
+    subparser.add_argument('-fr', '--find-renames', type=int,
+                           dest='rename_threshold', metavar='PERCENT',
+                           help='Similarity threshold to detect renames, '
+                                'default is the git default (50)')
+    subparser.add_argument('-fc', '--find-copies', type=int,
+                           dest='copy_threshold', metavar='PERCENT',
+                           help='Similarity threshold to detect copies, '
+                                'disabled by default')
+    subparser.add_argument('-cm', '--copy-mode', default='copy',
+                           choices=list(COPIERS),
+                           help='Strategy to copy files into the delta '
+                                'folder, \'reflink\' clones them if the '
+                                'filesystem supports it, \'hardlink\' only if'
+                                ' the delta folder is disposable, '
+                                'default=\'copy\'')
+    subparser.add_argument('-io', '--io-threads', default=8, type=int,
+                           help='Number of threads used to copy the files '
+                                'into the delta folder, default=8')
+    subparser.add_argument('-pl', '--plan', action='store_true',
+                           help='Only sizes the delta, writes a JSON summary '
+                                'in the artifacts folder without copying '
+                                'files nor writing the packages')
+    subparser.add_argument('-pf', '--profile', action='store_true',
+                           help='Dumps the cProfile stats of the differences '
+                                'handling in the artifacts folder')
+    subparser.add_argument('-lr', '--lazy-report', action='store_true',
+                           help='Writes the XML snippets of the HTML report '
+                                'in chunks next to it, loaded when a panel is'
+                                ' expanded, for deltas too big to inline')
+    subparser.add_argument('-mc', '--max-components', default=MAX_COMPONENTS,
+                           type=int,
+                           help='Components of a deploy, bigger deltas are '
+                                'also split into deploy units next to the '
+                                'delta folder, deployed in their order, '
+                                '0 to disable, '
+                                f'default={MAX_COMPONENTS}')
+    subparser.add_argument('-nc', '--no-checkout', action='store_false',
+                           dest='do_checkout',
+                           help='Flag to write the delta from the git objects'
+                                ' of the source ref without checking it out')
+    subparser.add_argument('-e', '--environment',
+                           help='Environment deployed, if no target is passed'
+                                ' the delta starts at the last deployment '
+                                'recorded for it, recorded with '
+                                'record_deploy once the delta is deployed')
+
+
+def __record_parser(subparser):
+    ''' Adds arguments for record deploy subparser '''
+    subparser.add_argument('-e', '--environment', required=True,
+                           help='Environment where the ref was deployed')
+    subparser.add_argument('-s', '--source', default='HEAD',
+                           help='Deployed ref, default=\'HEAD\'')
+    subparser.add_argument('-r', '--remote', default='origin',
+                           help='Remote name to push the deployment, '
+                                'default=\'origin\'')
+    subparser.add_argument('-p', '--push', action='store_true',
+                           help='Flag to push the recorded deployment to '
+                                'the remote')
 
 
 def __list_mc(subparser):
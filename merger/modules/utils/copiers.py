@@ -0,0 +1,105 @@
+''' Copiers module, strategies used to copy files into the delta folder '''
+import errno
+import os
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:  # not available on windows, reflinks are not supported
+    fcntl = None
+
+FICLONE = 0x40049409
+
+# errors meaning the strategy can not be used, any other error is raised
+UNSUPPORTED_ERRORS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EINVAL,
+                      errno.ENOTTY, errno.EOPNOTSUPP, errno.ENOSYS}
+
+
+class FileCopier:
+    ''' Plain copy strategy, also the fallback of the other strategies '''
+    NAME = 'copy'
+
+    def __init__(self):
+        self.bytes_copied = 0
+        self.bytes_linked = 0
+        self._lock = threading.Lock()
+
+    def copy(self, src, dest):
+        ''' Copies src into dest, same signature as shutil.copy '''
+        shutil.copy(src, dest)
+        self._count(dest, linked=False)
+        return dest
+
+    def _count(self, dest, linked):
+        ''' Adds the size of dest to the counters, copies can run in
+            several threads '''
+        size = os.path.getsize(dest)
+        with self._lock:
+            if linked:
+                self.bytes_linked += size
+            else:
+                self.bytes_copied += size
+
+    def copy_tree(self, src, dest):
+        ''' Copies a folder using the strategy for each file '''
+        shutil.copytree(src, dest, copy_function=self.copy)
+
+    def get_summary(self):
+        ''' Returns a message with the bytes copied and linked '''
+        return (f'Copied {self.bytes_copied} bytes, linked '
+                f'{self.bytes_linked} bytes (copy mode \'{self.NAME}\')')
+
+
+class ReflinkCopier(FileCopier):
+    ''' Clones the file (copy on write) if the filesystem supports it,
+        otherwise falls back to a plain copy for the rest of the run '''
+    NAME = 'reflink'
+
+    def __init__(self):
+        super().__init__()
+        self.supported = fcntl is not None
+
+    def copy(self, src, dest):
+        ''' Clones src into dest, copies it if cloning is not supported '''
+        if self.supported:
+            try:
+                with open(src, 'rb') as src_file, \
+                        open(dest, 'wb') as dest_file:
+                    fcntl.ioctl(dest_file.fileno(), FICLONE, src_file.fileno())
+                shutil.copymode(src, dest)
+                self._count(dest, linked=True)
+                return dest
+            except OSError as exception:
+                if exception.errno not in UNSUPPORTED_ERRORS:
+                    raise exception
+                self.supported = False
+        return super().copy(src, dest)
+
+
+class HardlinkCopier(FileCopier):
+    ''' Hard links the file, only valid if the delta folder is disposable
+        as the files share the content with the working tree '''
+    NAME = 'hardlink'
+
+    def copy(self, src, dest):
+        ''' Links src into dest, copies it if it can not be linked '''
+        try:
+            if os.path.lexists(dest):
+                os.remove(dest)
+            os.link(src, dest)
+            self._count(dest, linked=True)
+            return dest
+        except OSError as exception:
+            if exception.errno not in UNSUPPORTED_ERRORS:
+                raise exception
+        return super().copy(src, dest)
+
+
+COPIERS = {copier.NAME: copier
+           for copier in (FileCopier, ReflinkCopier, HardlinkCopier)}
+
+
+def get_copier(copy_mode):
+    ''' Returns a new copier of the passed mode '''
+    return COPIERS[copy_mode]()
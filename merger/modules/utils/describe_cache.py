@@ -0,0 +1,85 @@
+''' Compiled describe cache, shared with the mergeMetadata tool '''
+import os
+import re
+import json
+import pickle
+import hashlib
+
+# bump when the layout of the cached records changes
+CACHE_VERSION = 1
+CACHE_FOLDER = os.path.join(os.environ.get('XDG_CACHE_HOME',
+                                           os.path.expanduser('~/.cache')),
+                            'alm-sf-describe')
+
+LOG_REGEX = re.compile(r'\*+\nXMLName: ([a-zA-Z0-9]+)\nDirName: ([a-zA-Z0-9]+)'
+                       r'\nSuffix: ([a-zA-Z0-9]+)\nHasMetaFile: ([a-zA-Z]+)'
+                       r'\nInFolder: ([a-zA-Z]+)\nChildObjects: '
+                       r'(?:([a-zA-Z,]+),|)\*+', re.MULTILINE)
+
+
+def load_describe(filepath):
+    ''' Returns the metadata records of a describe, either from the cache
+        or parsing it and compiling the cache for the next run.
+        Records are plain dicts with the keys of the JSON describe '''
+    with open(filepath, 'rb') as file:
+        content = file.read()
+    cache_path = get_cache_path(content)
+    try:
+        with open(cache_path, 'rb') as file:
+            return pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    records = parse_describe(content.decode('utf-8'))
+    __write_cache(cache_path, records)
+    return records
+
+
+def get_cache_path(content):
+    ''' Returns the cache file of a describe given its content '''
+    digest = hashlib.sha256(content).hexdigest()
+    return os.path.join(CACHE_FOLDER, f'v{CACHE_VERSION}-{digest}.pickle')
+
+
+def parse_describe(data):
+    ''' Parses a describe in either JSON or log format '''
+    try:
+        return get_records_from_json(json.loads(data))
+    except ValueError:
+        return get_records_from_log(data)
+
+
+def get_records_from_json(data):
+    ''' Extracts the records of a JSON describe '''
+    return [{'xmlName': info['xmlName'],
+             'directoryName': info['directoryName'],
+             'suffix': info.get('suffix', ''),
+             'metaFile': info['metaFile'],
+             'inFolder': info['inFolder'],
+             'childXmlNames': list(info.get('childXmlNames', []))}
+            for info in data['metadataObjects']]
+
+
+def get_records_from_log(data):
+    ''' Extracts the records of a describe in log format '''
+    return [{'xmlName': xml_name,
+             'directoryName': dir_name,
+             'suffix': suffix,
+             'metaFile': 'true' == has_metadata,
+             'inFolder': 'true' == in_folder,
+             'childXmlNames': child_objects.split(',') if child_objects
+                              else []}
+            for (xml_name, dir_name, suffix, has_metadata,
+                 in_folder, child_objects) in LOG_REGEX.findall(data)]
+
+
+def __write_cache(cache_path, records):
+    ''' Writes the cache atomically, a read only cache folder is ignored '''
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        with open(temp_path, 'wb') as file:
+            pickle.dump(records, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
@@ -6,6 +6,17 @@ class MergerException(Exception):
     ''' Base Exception For Merger App '''
     ERROR_CODE = 127
 
+    def __reduce__(self):
+        # subclasses take different init args, rebuild them from the message
+        return (_rebuild_exception, (self.__class__, self.args))
+
+
+def _rebuild_exception(exception_class, args):
+    ''' Rebuilds a pickled merger exception without calling its init '''
+    exception = exception_class.__new__(exception_class)
+    Exception.__init__(exception, *args)
+    return exception
+
 
 class MergerExceptionWarning(MergerException):
     ''' Base Exception For Merger App '''
@@ -112,6 +123,42 @@ class MergeException(MergerException):
                              'check output')
 
 
+class BlobNotFound(MergerException):
+    '''Exception launched when a file does not exist in a revision'''
+    ERROR_CODE = 17
+
+    def __init__(self, filepath, revision):
+        super().__init__(f'Could not find \'{filepath}\' in revision '
+                         f'\'{revision}\'')
+
+
+class CouldNotDiff(MergerException):
+    '''Exception launched when git could not diff two references'''
+    ERROR_CODE = 18
+
+    def __init__(self, target, source, output):
+        super().__init__(f'Could not get differences between \'{target}\' '
+                         f'and \'{source}\'\n{output.strip()}')
+
+
+class InvalidEnvironment(MergerException):
+    '''Exception launched when the environment name can not be a git ref'''
+    ERROR_CODE = 19
+
+    def __init__(self, environment):
+        super().__init__(f'Invalid environment name \'{environment}\'')
+
+
+class CouldNotRecordDeployment(MergerException):
+    '''Exception launched when the deployment watermark could not be
+       recorded'''
+    ERROR_CODE = 20
+
+    def __init__(self, environment, revision, output):
+        super().__init__(f'Could not record \'{revision}\' as deployed to '
+                         f'\'{environment}\'\n{output.strip()}')
+
+
 # Release Exceptions
 
 
@@ -238,3 +285,53 @@ class InvalidPath(MergerException):
     def __init__(self, path_err):
         error_message = (f'The following path is invalid: {path_err}')
         super().__init__(error_message)
+
+
+class InvalidSchema(MergerException):
+    ''' Exception launched when a metadata schema can not be compiled '''
+    ERROR_CODE = 21
+
+    def __init__(self, schema_name, reason):
+        error_message = (f'The metadata schema \'{schema_name}\' is '
+                         f'invalid: {reason}')
+        super().__init__(error_message)
+
+
+class CouldNotMergeTree(MergerException):
+    ''' Exception launched when git merge-tree can not merge in memory '''
+    ERROR_CODE = 22
+
+    def __init__(self, source_branch, target_branch, output):
+        super().__init__(f'Could not merge \'{source_branch}\' into '
+                         f'\'{target_branch}\' in memory, git merge-tree '
+                         f'--write-tree needs git 2.38 or later\n'
+                         f'{output.strip()}')
+
+
+class NoFreeWorktree(MergerException):
+    ''' Exception launched when every worktree of the pool stays leased '''
+    ERROR_CODE = 23
+
+    def __init__(self, pool_size, timeout):
+        super().__init__(f'No worktree of the pool of {pool_size} was freed '
+                         f'in {timeout} seconds')
+
+
+class CouldNotCreateWorktree(MergerException):
+    ''' Exception launched when a worktree of the pool can not be added '''
+    ERROR_CODE = 24
+
+    def __init__(self, worktree, output):
+        super().__init__(f'Could not create worktree \'{worktree}\'\n'
+                         f'{output.strip()}')
+
+
+class WorktreesNotSupported(MergerException):
+    ''' Exception launched when the worktrees of the pool can not be locked
+        in the current platform '''
+    ERROR_CODE = 25
+
+    def __init__(self):
+        super().__init__('The worktree pool needs file locks through fcntl, '
+                         'not available in this platform, run the jobs '
+                         'without -wp')
@@ -0,0 +1,102 @@
+''' HTML report module, renders the merger report with the XML snippets of
+    the modified children either inlined or in a sidecar of chunks '''
+import json
+import os
+import shutil
+from functools import lru_cache
+
+import jinja2
+
+from modules.utils import PWD, open_file, pprint_xml
+
+TEMPLATES_FOLDER = f'{PWD}/resources/templates'
+TEMPLATES_CACHE_FOLDER = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+    'alm-sf-templates')
+SNIPPETS_FOLDER = 'mergerReport.snippets'
+SNIPPETS_PER_CHUNK = 500
+# each chunk is a script, so it can be loaded from a report opened as a file
+CHUNK_CALLBACK = 'loadSnippets'
+
+
+@lru_cache(maxsize=None)
+def get_environment():
+    ''' Returns the jinja environment of the templates, the compiled
+        templates are cached as bytecode between runs '''
+    try:
+        os.makedirs(TEMPLATES_CACHE_FOLDER, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(TEMPLATES_CACHE_FOLDER)
+    except OSError:
+        bytecode_cache = None
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(searchpath=TEMPLATES_FOLDER),
+        bytecode_cache=bytecode_cache)
+
+
+def iter_snippets(treedict):
+    ''' Yields the package name, the unique name and the child element of
+        every modified child of the tree, grouped by package '''
+    for package_name, value in treedict.items():
+        for _, data_dict in value.items():
+            if not isinstance(data_dict, dict):
+                continue
+            for apiname, child_dicts in data_dict.items():
+                for _, attr_dicts in child_dicts.items():
+                    for _, children in attr_dicts.items():
+                        for child in children:
+                            yield (package_name,
+                                   get_unique_name(package_name, apiname,
+                                                   child),
+                                   child)
+
+
+def get_unique_name(mdt_type, mtd_name, mdt_value):
+    ''' Create unique name for keys in dicts '''
+    return f'{mdt_type}.{mtd_name}.{mdt_value._apiname}'
+
+
+def get_snippets(treedict):
+    ''' Returns a dict with the pretty printed xml of every modified child '''
+    return {name_id: pprint_xml(child.get_xml(), False)
+            for _, name_id, child in iter_snippets(treedict)}
+
+
+def write_snippet_chunks(treedict, report_folder):
+    ''' Writes the snippets into chunks of the sidecar folder, a chunk never
+        mixes packages so expanding a panel only loads its own chunks.
+        Returns the chunk of every snippet and the chunks of every package '''
+    shutil.rmtree(f'{report_folder}/{SNIPPETS_FOLDER}', ignore_errors=True)
+    os.makedirs(f'{report_folder}/{SNIPPETS_FOLDER}')
+    snippet_chunks = {}
+    package_chunks = {}
+    chunk = {}
+    index = -1
+    for package_name, name_id, child in iter_snippets(treedict):
+        if chunk and (package_name not in package_chunks
+                      or len(chunk) == SNIPPETS_PER_CHUNK):
+            __write_chunk(report_folder, index, chunk)
+            chunk = {}
+        if not chunk:
+            index += 1
+            package_chunks.setdefault(package_name, []).append(index)
+        chunk[name_id] = pprint_xml(child.get_xml(), False)
+        snippet_chunks[name_id] = index
+    if chunk:
+        __write_chunk(report_folder, index, chunk)
+    return snippet_chunks, package_chunks
+
+
+def render_report(report_folder, filename, template_name, **context):
+    ''' Renders the template streaming it into the report file '''
+    template = get_environment().get_template(template_name)
+    with open_file(report_folder, filename, print_log=True) as report_file:
+        template.stream(**context).dump(report_file)
+
+
+def __write_chunk(report_folder, index, snippets):
+    ''' Writes a chunk of snippets as a script calling the callback '''
+    with open(f'{report_folder}/{SNIPPETS_FOLDER}/chunk-{index}.js', 'w',
+              encoding='utf-8') as chunk_file:
+        chunk_file.write(f'{CHUNK_CALLBACK}(')
+        json.dump(snippets, chunk_file, separators=(',', ':'))
+        chunk_file.write(');\n')
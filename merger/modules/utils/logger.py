@@ -0,0 +1,167 @@
+''' Logger module, every message of the merger goes through this layer '''
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from logging.handlers import MemoryHandler
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+# requested output (listings, the plan), never suppressed by --quiet
+RESULT = logging.CRITICAL + 10
+logging.addLevelName(RESULT, 'RESULT')
+
+LOG_FORMATS = ('text', 'jsonl')
+BUFFER_CAPACITY = 1000
+# unbuffered python output also means unbuffered messages
+FLUSH_INTERVAL = 0.0 if os.environ.get('PYTHONUNBUFFERED') else 1.0
+ANSI_ESCAPE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
+
+LOGGER = logging.getLogger('merger')
+
+
+class JsonLinesFormatter(logging.Formatter):
+    ''' Formats each record as a JSON object in a line, without colors '''
+
+    def format(self, record):
+        return json.dumps({'time': round(record.created, 6),
+                           'level': record.levelname,
+                           'message': ANSI_ESCAPE.sub('',
+                                                      record.getMessage())})
+
+
+class BufferedHandler(MemoryHandler):
+    ''' Buffers the records, flushing them when the buffer is full, an error
+        is logged or the interval elapsed since the oldest buffered record,
+        even if no other record is logged meanwhile '''
+
+    def __init__(self, target, capacity=BUFFER_CAPACITY,
+                 interval=FLUSH_INTERVAL):
+        super().__init__(capacity, flushLevel=ERROR, target=target)
+        self.interval = interval
+        self.__timer = None
+
+    def shouldFlush(self, record):
+        if super().shouldFlush(record) or self.interval <= 0:
+            return True
+        # a timer inherited by a forked process is not running
+        if self.__timer is None or not self.__timer.is_alive():
+            self.__timer = threading.Timer(self.interval, self.flush)
+            self.__timer.daemon = True
+            self.__timer.start()
+        return False
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            super().flush()
+        finally:
+            self.release()
+
+
+class _CaptureHandler(logging.Handler):
+    ''' Keeps the records with their message already formatted, so they can
+        be pickled and replayed by another process '''
+
+    def __init__(self, records):
+        super().__init__()
+        self.records = records
+
+    def emit(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+
+def configure(level=INFO, log_format='text', stream=None):
+    ''' Sets the level and the format of the output, replacing the previous
+        configuration '''
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonLinesFormatter() if log_format == 'jsonl'
+                         else logging.Formatter('%(message)s'))
+    for previous in LOGGER.handlers:
+        previous.close()
+    # on a terminal every message is shown as soon as it is logged
+    interval = 0.0 if handler.stream.isatty() else FLUSH_INTERVAL
+    LOGGER.handlers = [BufferedHandler(handler, interval=interval)]
+    LOGGER.setLevel(level)
+    LOGGER.propagate = False
+
+
+def get_level():
+    ''' Returns the configured level '''
+    return LOGGER.level
+
+
+def is_enabled(level):
+    ''' Returns true if messages of the level are emitted, messages built
+        in hot paths must be guarded with it '''
+    return LOGGER.isEnabledFor(level)
+
+
+def flush():
+    ''' Emits the buffered records '''
+    for handler in LOGGER.handlers:
+        handler.flush()
+
+
+def log(level, message, *args):
+    ''' Logs a message of the level, the args are formatted only if
+        emitted '''
+    LOGGER.log(level, message, *args)
+
+
+def debug(message, *args):
+    ''' Logs a debug message, the args are formatted only if emitted '''
+    LOGGER.debug(message, *args)
+
+
+def info(message='', *args):
+    ''' Logs an info message, the args are formatted only if emitted '''
+    LOGGER.info(message, *args)
+
+
+def warning(message, *args):
+    ''' Logs a warning message, the args are formatted only if emitted '''
+    LOGGER.warning(message, *args)
+
+
+def error(message, *args):
+    ''' Logs an error message, the args are formatted only if emitted '''
+    LOGGER.error(message, *args)
+
+
+def result(message, *args):
+    ''' Logs requested output, emitted even with --quiet '''
+    LOGGER.log(RESULT, message, *args)
+
+
+@contextmanager
+def capture():
+    ''' Collects the records logged inside the block instead of emitting
+        them, to be emitted later with replay '''
+    records = []
+    previous = LOGGER.handlers
+    LOGGER.handlers = [_CaptureHandler(records)]
+    try:
+        yield records
+    finally:
+        LOGGER.handlers = previous
+
+
+def replay(records):
+    ''' Emits records captured in this or another process '''
+    for record in records:
+        LOGGER.handle(record)
+
+
+configure()
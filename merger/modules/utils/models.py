@@ -14,21 +14,6 @@ class OutputType(enum.Enum):
         return [item.value for item in OutputType]
 
 
-class MetadataType:
-    ''' Metadata Type Implementation for wrapping the describe log info '''
-    def __init__(self, xml_name, dir_name, suffix, has_metadata,
-                 in_folder, child_objects):
-        self.xml_name = xml_name
-        self.dir_name = dir_name
-        self.suffix = suffix
-        self.has_metadata = bool(has_metadata)
-        self.in_folder = bool(in_folder)
-        self.child_objects = child_objects.split(',')
-
-    def __repr__(self):
-        return f'<{self.xml_name}>'
-
-
 class MetadataTypeFromJSON:
     ''' Metadata Type Implementation for wrapping the describe log info '''
 
@@ -44,6 +29,54 @@ class MetadataTypeFromJSON:
         return f'<{self.xml_name}>'
 
 
+class DescribeIndex(dict):
+    ''' Metadata types of a describe keyed by folder, with constant time
+        lookups by directory name, xml name and suffix '''
+
+    def __init__(self, records):
+        super().__init__()
+        self.by_directory = {}
+        self.by_xml_name = {}
+        self.by_suffix = {}
+        self.by_child_xml_name = {}
+        for record in records:
+            metadata_type = MetadataTypeFromJSON(record['xmlName'],
+                                                 record['directoryName'],
+                                                 record['suffix'],
+                                                 record['metaFile'],
+                                                 record['inFolder'],
+                                                 record['childXmlNames'])
+            dict_key = metadata_type.dir_name
+            if ('territory2Models' == metadata_type.dir_name
+                    and 'territory2Model' != metadata_type.suffix):
+                dict_key = metadata_type.suffix
+            self[dict_key] = metadata_type
+            self.by_directory.setdefault(metadata_type.dir_name,
+                                         metadata_type)
+            self.by_xml_name[metadata_type.xml_name] = metadata_type
+            if metadata_type.suffix:
+                self.by_suffix.setdefault(metadata_type.suffix, metadata_type)
+            for child_xml_name in metadata_type.child_objects or ():
+                self.by_child_xml_name.setdefault(child_xml_name,
+                                                  metadata_type)
+
+    def get_by_directory(self, dir_name):
+        ''' Returns the first metadata type stored in the directory '''
+        return self.by_directory.get(dir_name, None)
+
+    def get_by_xml_name(self, xml_name):
+        ''' Returns the metadata type with the xml name '''
+        return self.by_xml_name.get(xml_name, None)
+
+    def get_by_suffix(self, suffix):
+        ''' Returns the metadata type using the file suffix '''
+        return self.by_suffix.get(suffix, None)
+
+    def get_parent(self, child_xml_name):
+        ''' Returns the metadata type whose files contain the child type '''
+        return self.by_child_xml_name.get(child_xml_name, None)
+
+
 class ChangeType(enum.Enum):
     ''' Type of changes, git like '''
     CREATION = 'A'
@@ -1,86 +1,93 @@
 ''' Reporter Module '''
+import re
 
 from colorama import Fore, Style
 
+from modules.utils import logger
 
-def get_tree_string(changes):
-    ''' Returns a String with a tree view of all the changes of a builder '''
-    output = f'{Style.DIM}'
-    for package_name, values in changes.items():
-        added = values['A'] if 'A' in values else set()
-
-        modified = values['M'] if 'M' in values else set()
-        erased = values['D'] if 'D' in values else set()
-        output += get_package_differences(package_name, added,
-                                          modified, erased)
-    return output
+# the repr of the child objects embeds its own colors
+ANSI_ESCAPE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
 
 
-def get_package_differences(child_xml_name, added, modified, erased):
-    ''' Returns additions, modifications and deletions
-        from a passed package '''
-    if added or modified or erased:
-        indent = ' ' * 3
+class TextSink:
+    ''' Writes the lines of the tree without colors into a file '''
 
-        added_string = __difference_line(f'Added ({len(added)})', added)
-        modified_string = __difference_line(f'Modified ({len(modified)})',
-                                            modified)
-        erased_string = __difference_line(f'Erased ({len(erased)})', erased)
-        return(f'{indent}▶︎ {Fore.GREEN}{child_xml_name}{Fore.RESET}:\n'
-               f'{added_string}{modified_string}{erased_string}')
+    def __init__(self, output_file):
+        self.output_file = output_file
 
+    def write(self, line):
+        ''' Writes a line given as (color, text) segments '''
+        for _, text in line:
+            if '\x1b' in text:
+                text = ANSI_ESCAPE.sub('', text)
+            self.output_file.write(text)
+        self.output_file.write('\n')
 
-def __difference_line(name, values):
-    ''' Returns a formated string with the Difference type and values '''
-    if values:
-        indent = ' ' * 6
-        return (f'{indent}► {Fore.YELLOW}{name}{Fore.RESET}:\n'
-                f'{__difference_item(values)}')
-    return ''
 
+class ConsoleSink:
+    ''' Logs the lines of the tree with colors as requested output '''
 
-def __difference_item(values):
-    ''' Returns a string with all the differences of a child element '''
-    indent = ' ' * 9
+    def write(self, line):
+        ''' Logs a line given as (color, text) segments '''
+        logger.result(Style.DIM + ''.join(f'{color}{text}{Fore.RESET}'
+                                          if color else text
+                                          for color, text in line))
 
-    if isinstance(values, set):
-        return '\n'.join(
-            [f'{indent}▸ {Fore.LIGHTMAGENTA_EX}{value}{Fore.RESET}'
-             for value in values]) + '\n'
 
-    output = ''
-    for apiname, child_objects in values.items():
-        output += f'{get_apiname(apiname)}\n'
-        for child_object, child_values in child_objects.items():
-            output += child_differences(child_object, child_values['A'],
-                                        child_values['M'], child_values['D'])
-    return output
+def write_tree(changes, sinks):
+    ''' Walks the changes of a builder once, writing every line of the tree
+        view into all the sinks '''
+    for line in iter_tree_lines(changes):
+        for sink in sinks:
+            sink.write(line)
 
 
-def get_apiname(apiname):
-    ''' Print a warning message '''
+def iter_tree_lines(changes):
+    ''' Yields the lines of a tree view of all the changes of a builder,
+        each line as a tuple of (color, text) segments '''
+    for package_name, values in changes.items():
+        added = values['A'] if 'A' in values else set()
+        modified = values['M'] if 'M' in values else set()
+        erased = values['D'] if 'D' in values else set()
+        if not (added or modified or erased):
+            continue
+        yield ((None, f'{" " * 3}▶︎ '), (Fore.GREEN, package_name),
+               (None, ':'))
+        yield from __difference_lines(f'Added ({len(added)})', added)
+        yield from __difference_lines(f'Modified ({len(modified)})',
+                                      modified)
+        yield from __difference_lines(f'Erased ({len(erased)})', erased)
+
+
+def __difference_lines(name, values):
+    ''' Yields the Difference type and the lines of its values, either
+        apinames or apinames with the differences of their children '''
+    if not values:
+        return
+    yield ((None, f'{" " * 6}► '), (Fore.YELLOW, name), (None, ':'))
     indent = ' ' * 9
-    return f'{indent}▸ {Fore.LIGHTMAGENTA_EX}{apiname} {Fore.RESET}'
-
-
-def child_differences(child_xml_name, added, modified, erased):
-    ''' Pretty print differences '''
-    if added or modified or erased:
-        added_string = __difference_line_item(f'Added ({len(added)})', added)
-        modified_string = __difference_line_item(f'Modified ({len(modified)})',
-                                                 modified)
-        erased_string = __difference_line_item(f'Erased ({len(erased)})',
-                                               erased)
-        indent = ' ' * 12
-        return(f'{Style.DIM}{indent}▹ {Fore.MAGENTA}{child_xml_name}'
-               f'{Fore.RESET}:\n{added_string}{modified_string}'
-               f'{erased_string}')
-    return ''
-
-
-def __difference_line_item(name, values):
-    ''' Returns a formated string with the Difference type and values '''
-    if values:
-        indent = ' ' * 15
-        return f'{indent}- {Fore.YELLOW}{name}{Fore.RESET}: {values}\n'
-    return ''
+    if isinstance(values, set):
+        for value in sorted(values):
+            yield ((None, f'{indent}▸ '), (Fore.LIGHTMAGENTA_EX, value))
+        return
+
+    for apiname, child_objects in sorted(values.items()):
+        yield ((None, f'{indent}▸ '), (Fore.LIGHTMAGENTA_EX, f'{apiname} '))
+        for child_object, child_values in child_objects.items():
+            yield from __child_lines(child_object, child_values)
+
+
+def __child_lines(child_xml_name, child_values):
+    ''' Yields the additions, modifications and deletions of a child '''
+    changes = (('Added', child_values['A']),
+               ('Modified', child_values['M']),
+               ('Erased', child_values['D']))
+    if not any(values for _, values in changes):
+        return
+    yield ((None, f'{" " * 12}▹ '), (Fore.MAGENTA, child_xml_name),
+           (None, ':'))
+    for name, values in changes:
+        if values:
+            yield ((None, f'{" " * 15}- '),
+                   (Fore.YELLOW, f'{name} ({len(values)})'),
+                   (None, f': {sorted(values)}'))
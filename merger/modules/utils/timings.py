@@ -0,0 +1,111 @@
+''' Timings module, instrumentation of the phases of a merger run '''
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+from modules.utils import ARTIFACTS_FOLDER, logger, write_file
+
+TIMINGS_FILE = 'merger-timings.json'
+PROFILE_FILE = 'merger-handle-differences.prof'
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND
+
+__COUNTERS = {'files_read': 0, 'files_written': 0, 'subprocesses': 0}
+__LOCK = threading.Lock()
+__HOOK_INSTALLED = False
+
+
+def _audit(event, args):
+    ''' Audit hook counting the files opened and the subprocesses started
+        by this process, breakdown worker processes are not counted '''
+    if event == 'open':
+        _, mode, flags = args
+        written = (any(char in mode for char in 'wax+') if mode
+                   else bool(flags & WRITE_FLAGS))
+        counter = 'files_written' if written else 'files_read'
+    elif event == 'subprocess.Popen':
+        counter = 'subprocesses'
+    else:
+        return
+    with __LOCK:
+        __COUNTERS[counter] += 1
+
+
+def get_counters():
+    ''' Returns a copy of the counters, installs the audit hook on the
+        first call since hooks can not be removed. Audit hooks are only
+        available from python 3.8, before it the phases have no counters '''
+    global __HOOK_INSTALLED  # pylint: disable=W0603
+    if not hasattr(sys, 'addaudithook'):
+        return {}
+    if not __HOOK_INSTALLED:
+        sys.addaudithook(_audit)
+        __HOOK_INSTALLED = True
+    with __LOCK:
+        return dict(__COUNTERS)
+
+
+class PhaseTimer:
+    ''' Times consecutive phases of a run, with the files read and written
+        and the subprocesses started in each of them '''
+
+    def __init__(self, command):
+        self.command = command
+        self.phases = []
+        self.__current = None
+        self.__start = time.perf_counter()
+
+    def start(self, name):
+        ''' Stops the current phase and starts the next one, the banners
+            logged before it are shown before the phase runs '''
+        self.stop()
+        logger.flush()
+        self.__current = (name, time.perf_counter(), get_counters())
+
+    def stop(self):
+        ''' Stops the current phase if any '''
+        if not self.__current:
+            return
+        name, start, counters = self.__current
+        end_counters = get_counters()
+        phase = {'name': name,
+                 'seconds': round(time.perf_counter() - start, 6)}
+        phase.update({counter: end_counters[counter] - value
+                      for counter, value in counters.items()})
+        self.phases.append(phase)
+        self.__current = None
+
+    def to_dict(self):
+        ''' Returns the timings of the run '''
+        return {'command': self.command,
+                'seconds': round(time.perf_counter() - self.__start, 6),
+                'phases': self.phases}
+
+    def write(self, report_folder=ARTIFACTS_FOLDER):
+        ''' Stops the current phase and writes the timings file '''
+        self.stop()
+        write_file(report_folder, TIMINGS_FILE,
+                   json.dumps(self.to_dict(), indent=4), print_log=True)
+
+
+def call_profiled(profile_path, function, *args):
+    ''' Calls the function, if a profile path is passed the cProfile stats
+        of the call are dumped into it, and the top functions by cumulative
+        time into the same path with a .txt extension '''
+    if not profile_path:
+        return function(*args)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args)
+    finally:
+        os.makedirs(os.path.dirname(profile_path) or '.', exist_ok=True)
+        profiler.dump_stats(profile_path)
+        stats_text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stats_text)
+        stats.sort_stats('cumulative').print_stats(50)
+        folder, filename = os.path.split(f'{profile_path}.txt')
+        write_file(folder or '.', filename, stats_text.getvalue())
@@ -0,0 +1,12 @@
+<?xml version='1.0' encoding='utf-8'?>
+<Profile xmlns="http://soap.sforce.com/2006/04/metadata"><fieldPermissions>
+        <editable>false</editable>
+        <field>Obj__c.F1__c</field>
+        <readable>true</readable>
+    </fieldPermissions>
+    <fieldPermissions>
+        <editable>true</editable>
+        <field>Obj__c.F4__c</field>
+        <readable>true</readable>
+    </fieldPermissions>
+    </Profile>
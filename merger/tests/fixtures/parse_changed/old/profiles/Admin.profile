@@ -0,0 +1,15 @@
+<?xml version="1.0" encoding="UTF-8"?>
+<Profile xmlns="http://soap.sforce.com/2006/04/metadata">
+    <custom>false</custom>
+    <fieldPermissions>
+        <editable>true</editable>
+        <field>Obj__c.F1__c</field>
+        <readable>true</readable>
+    </fieldPermissions>
+    <fieldPermissions>
+        <editable>true</editable>
+        <field>Obj__c.F2__c</field>
+        <readable>true</readable>
+    </fieldPermissions>
+    <userLicense>Salesforce</userLicense>
+</Profile>
@@ -0,0 +1,135 @@
+''' Regression tests of the parse of the changed children, the fixtures hold
+    both versions of each file and the expected delta of the ones that
+    changed '''
+import os
+import sys
+import unittest
+from collections import namedtuple
+from contextlib import ExitStack
+from unittest import mock
+
+import modules.parser.digests
+import modules.parser.models
+from modules.delta_builder import BuildersRecorder
+from modules.parser import IMPLEMENTED_CHILD, parse_changed, parse_file
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                               'fixtures', 'parse_changed')
+SOURCE_REF = 'new'
+TARGET_REF = 'old'
+EXPECTED_FOLDER = f'{FIXTURES_FOLDER}/expected'
+# smallest size of a file parsed as a stream, by parse mode
+STREAMING_SIZES = {'tree': sys.maxsize, 'stream': 0}
+XML_NAMES = {metadata_class.FOLDER_NAME: xml_name
+             for xml_name, metadata_class in IMPLEMENTED_CHILD.items()}
+
+XmlDefinition = namedtuple('XmlDefinition', ['xml_name'])
+
+
+class FixtureReader:
+    ''' Reads the versions of the fixtures as the blob reader of git '''
+
+    def read(self, filepath, revision):
+        ''' Returns the raw bytes of the file in the passed revision '''
+        with open(f'{FIXTURES_FOLDER}/{revision}/{filepath}',
+                  'rb') as fixture_file:
+            return fixture_file.read()
+
+
+def get_fixtures():
+    ''' Returns the paths of the fixtures, relative to each version '''
+    source_folder = f'{FIXTURES_FOLDER}/{SOURCE_REF}'
+    return sorted(os.path.relpath(f'{root}/{filename}', source_folder)
+                  for root, _, filenames in os.walk(source_folder)
+                  for filename in filenames)
+
+
+def get_definition(filepath):
+    ''' Returns the definition of the type of the file by its folder '''
+    return XmlDefinition(XML_NAMES[filepath.split('/')[0]])
+
+
+def get_delta(old, new):
+    ''' Returns the xml of the differences, or None if there are not '''
+    differences = old.compare(new, BuildersRecorder())
+    return differences.to_string() if differences else None
+
+
+class ParseChangedTest(unittest.TestCase):
+    ''' Deltas built parsing only the changed children '''
+
+    def test_expected_deltas(self):
+        ''' The delta of each fixture is the expected one, in both modes '''
+        for mode in STREAMING_SIZES:
+            for filepath in get_fixtures():
+                with self.subTest(mode=mode, filepath=filepath):
+                    new, old = self.__parse_changed(filepath, mode)
+                    self.assertEqual(get_delta(old, new),
+                                     self.__read_expected(filepath))
+
+    def test_same_as_full_parse(self):
+        ''' The delta is the same as parsing the whole files '''
+        reader = FixtureReader()
+        for mode in STREAMING_SIZES:
+            for filepath in get_fixtures():
+                with self.subTest(mode=mode, filepath=filepath):
+                    new, old = self.__parse_changed(filepath, mode)
+                    with self.__streaming(mode):
+                        full_new = parse_file(filepath,
+                                              get_definition(filepath),
+                                              SOURCE_REF, reader)
+                        full_old = parse_file(filepath,
+                                              get_definition(filepath),
+                                              TARGET_REF, reader)
+                    self.assertEqual(get_delta(old, new),
+                                     get_delta(full_old, full_new))
+
+    def test_unchanged_keyed_children(self):
+        ''' Only the changed, added and removed keyed children are built '''
+        for mode in STREAMING_SIZES:
+            with self.subTest(mode=mode):
+                new, old = self.__parse_changed(
+                    'permissionsets/Sales.permissionset', mode)
+                self.assertEqual(set(new.fieldPermissions),
+                                 {'Sales.Obj__c.F1__c', 'Sales.Obj__c.F4__c'})
+                self.assertEqual(set(old.fieldPermissions),
+                                 {'Sales.Obj__c.F1__c', 'Sales.Obj__c.F3__c'})
+
+    def test_unchanged_minimum_values(self):
+        ''' The minimum values of CustomObject are built even if unchanged '''
+        for mode in STREAMING_SIZES:
+            with self.subTest(mode=mode):
+                new, _ = self.__parse_changed('objects/Obj__c.object', mode)
+                self.assertEqual(set(new.fields), {'Obj__c.F1__c'})
+                for tag_name in ('label', 'pluralLabel', 'nameField',
+                                 'searchLayouts', 'deploymentStatus',
+                                 'sharingModel'):
+                    self.assertTrue(hasattr(new, tag_name), tag_name)
+
+    def __parse_changed(self, filepath, mode):
+        ''' Returns the new and the old objects of a fixture '''
+        with self.__streaming(mode):
+            return parse_changed(filepath, get_definition(filepath),
+                                 SOURCE_REF, TARGET_REF, FixtureReader())
+
+    @staticmethod
+    def __streaming(mode):
+        ''' Context where the files are parsed in the passed mode '''
+        stack = ExitStack()
+        for module in (modules.parser.models, modules.parser.digests):
+            stack.enter_context(mock.patch.object(
+                module, 'STREAMING_MIN_BYTES', STREAMING_SIZES[mode]))
+        return stack
+
+    @staticmethod
+    def __read_expected(filepath):
+        ''' Returns the expected delta, or None if the file did not change '''
+        expected_path = f'{EXPECTED_FOLDER}/{filepath}'
+        if not os.path.exists(expected_path):
+            return None
+        with open(expected_path, 'r', encoding='utf-8') as expected_file:
+            return expected_file.read()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,16 @@
 from modules.utils import argparser
-from modules.parser.parseReport import getAlertsFromReport
-from modules.parser.generateReport import createReport
 
 def main():
 	
 	args = argparser.parseArgs()
 
+	# lxml and jinja2 are loaded once the args are valid, jinja2 only if
+	# there is a report to render
+	from modules.parser.parseReport import getAlertsFromReport  # pylint: disable=C0415
 	mapAlerts, mapIssuesByLevel = getAlertsFromReport( args.reportFile, args.srcPath )
 
 	if len( mapAlerts ) > 0:
+		from modules.parser.generateReport import createReport  # pylint: disable=C0415
 		createReport( mapAlerts, mapIssuesByLevel, args.outputFile )
 
 if __name__ == "__main__":
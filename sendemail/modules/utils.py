@@ -5,14 +5,10 @@ import itertools
 import os
 import os.path as op
 import re
-import smtplib
-from email import encoders
-from email.mime.base import MIMEBase
 from enum import Enum
 
-from colorama import Fore, init
+from colorama import Fore
 
-init(autoreset=True)
 INFO_TAG = f'{Fore.YELLOW}[INFO]{Fore.RESET}'
 FATAL_LINE = f'{Fore.RED}[FATAL]'
 FATAL_TAG = f'{Fore.RED}[FATAL]{Fore.RESET}'
@@ -48,6 +44,7 @@ def get_salutation():
 
 def get_smtp_server(server_address, username, password, tls, no_login):
     ''' Intializes the smtp server '''
+    import smtplib  # pylint: disable=C0415
     print(f'{INFO_TAG} Loggin in \'{server_address}\'')
     server = smtplib.SMTP(server_address)
     if tls:
@@ -94,6 +91,9 @@ def get_mr_url(remote_url, iid):
 
 def attach_files(msg, files, folder, pwd, sel_photos):
     ''' Attach files passed by param (& image files little bit hardcoded) '''
+    # pylint: disable=C0415
+    from email import encoders
+    from email.mime.base import MIMEBase
     for filename in files:
         part = MIMEBase('application', "octet-stream")
         with open(f"{folder}/{filename}", 'rb') as file:
@@ -2,13 +2,12 @@
     implements the necessary methods to notify of the results
     of the CI/CD process'''
 import os
-import smtplib
 import sys
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from string import Template
 import traceback
 
+from colorama import init
+
 from modules.custom_argparser import parse_args
 from modules.utils import (FATAL_LINE, INFO_TAG, SUCCESS_LINE, Resources,
                            attach_files, get_allure_url, get_remote_url,
@@ -49,6 +48,9 @@ def notify_validate(smtp_server, status, recipients,
         - The Carbon Copy Recipients of the email
         - The files to attach (images not included)
         - The replyto email, if None === the email used to log in'''
+    # pylint: disable=C0415
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
     print_key_value_list(f'{INFO_TAG} Sending \'selenium\' email:',
                          [('Status', status), ('Files', files),
                           ('Recipients', recipients),
@@ -91,6 +93,9 @@ def notify_validate(smtp_server, status, recipients,
 
 def selenium(smtp_server, recipients, recipients_cc, replyto=None):
     ''' Notifies selenium errors '''
+    # pylint: disable=C0415
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
     print_key_value_list(f'{INFO_TAG} Sending \'selenium\' email:',
                          [('Recipients', recipients),
                           ('Recipients CC', recipients_cc),
@@ -147,6 +152,8 @@ def main():
     if args.option == 'version':
         print(__version__)
         sys.exit(0)
+    init(autoreset=True)
+    import smtplib  # pylint: disable=C0415
     try:
         smtp_server = get_smtp_server(args.server_address, args.username,
                                       args.password, args.tls, args.no_login)